@@ -1,66 +1,83 @@
 import os
 from pathlib import Path
+from dataclasses import dataclass, field
 from typing import List
-from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 
 load_dotenv()
 
-class GitHubConfig(BaseModel):
+# Environment is read once at import; it does not change after startup
+_GITHUB_TOKEN = os.getenv("GITHUB_TOKEN", "")
+_GITHUB_REPOS = os.getenv("GITHUB_REPOS", "")
+_OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+_DATABASE_URL = os.getenv("DATABASE_URL", "")
+
+@dataclass(frozen=True, slots=True)
+class GitHubConfig:
     """GitHub integration settings"""
-    token: str = Field(default_factory=lambda: os.getenv("GITHUB_TOKEN", ""))
-    repos: List[str] = Field(default_factory=lambda: os.getenv("GITHUB_REPOS", "").split(",") if os.getenv("GITHUB_REPOS") else [])
-    clone_dir: Path = Field(default=Path("./data/repos"))
-    excluded_patterns: List[str] = Field(default=[
+    token: str = _GITHUB_TOKEN
+    repos: List[str] = field(default_factory=lambda: _GITHUB_REPOS.split(",") if _GITHUB_REPOS else [])
+    clone_dir: Path = Path("./data/repos")
+    excluded_patterns: List[str] = field(default_factory=lambda: [
         "node_modules/", "vendor/", ".git/", "*.min.js", 
         "package-lock.json", "*.lock"
     ])
     max_file_size_mb: int = 1
     
-class LLMConfig(BaseModel):
+@dataclass(frozen=True, slots=True)
+class LLMConfig:
     """LLM settings"""
-    api_key: str = Field(default_factory=lambda: os.getenv("OPENAI_API_KEY", ""))
+    api_key: str = _OPENAI_API_KEY
     model: str = "gpt-4o"
     temperature: float = 0.1
     max_tokens: int = 1500
     embedding_model: str = "text-embedding-3-small"
+    response_cache_size: int = 1024
     
-class ChunkingConfig(BaseModel):
+@dataclass(frozen=True, slots=True)
+class ChunkingConfig:
     """Chunking parameters"""
     chunk_size: int = 512
     chunk_overlap: int = 50
     
-class ObservabilityConfig(BaseModel):
+@dataclass(frozen=True, slots=True)
+class ObservabilityConfig:
     """Logging and metrics"""
     log_level: str = "INFO"
-    log_file: Path = Field(default=Path("./logs/app.log"))
+    log_file: Path = Path("./logs/app.log")
     enable_metrics: bool = True
 
-class DatabaseConfig(BaseModel):
+@dataclass(frozen=True, slots=True)
+class DatabaseConfig:
     """Database settings"""
-    url: str = Field(default_factory=lambda: os.getenv("DATABASE_URL", ""))
+    url: str = _DATABASE_URL
+    pool_size: int = 10  # Max pooled connections per process
+    hnsw_m: int = 24  # Graph degree of the embedding index
+    hnsw_ef_construction: int = 128  # Candidate list size while building the index
+    hnsw_ef_search: int = 100  # Candidate list size per query (raised to the query limit)
+    hnsw_ef_search_max: int = 400  # Cap on ef_search when scaled up for filtered queries
+    hnsw_max_scan_tuples: int = 20000  # Iterative scan budget for filtered queries (pgvector 0.8+)
+    index_build_memory: str = "2GB"  # maintenance_work_mem for index builds
+    memory_index: bool = False  # Serve semantic search from an in-process index (needs usearch)
 
-class Settings(BaseModel):
+@dataclass(frozen=True, slots=True)
+class Settings:
     """Application settings"""
-    github: GitHubConfig = Field(default_factory=GitHubConfig)
-    llm: LLMConfig = Field(default_factory=LLMConfig)
-    chunking: ChunkingConfig = Field(default_factory=ChunkingConfig)
-    observability: ObservabilityConfig = Field(default_factory=ObservabilityConfig)
-    database: DatabaseConfig = Field(default_factory=DatabaseConfig)
+    github: GitHubConfig = field(default_factory=GitHubConfig)
+    llm: LLMConfig = field(default_factory=LLMConfig)
+    chunking: ChunkingConfig = field(default_factory=ChunkingConfig)
+    observability: ObservabilityConfig = field(default_factory=ObservabilityConfig)
+    database: DatabaseConfig = field(default_factory=DatabaseConfig)
     
     def validate_required(self):
-        """Validate required settings are present"""
-        errors = []
+        """Validate required settings are present, failing on the first missing one"""
         if not self.github.token:
-            errors.append("GITHUB_TOKEN not set")
+            raise ValueError("GITHUB_TOKEN not set")
         if not self.llm.api_key:
-            errors.append("OPENAI_API_KEY not set")
+            raise ValueError("OPENAI_API_KEY not set")
         if not self.github.repos:
-            errors.append("No repositories configured")
+            raise ValueError("No repositories configured")
         if not self.database.url:
-            errors.append("DATABASE_URL not set")
-        
-        if errors:
-            raise ValueError(f"Configuration errors: {', '.join(errors)}")
+            raise ValueError("DATABASE_URL not set")
 
 settings = Settings()
\ No newline at end of file
@@ -1,3 +1,3 @@
-from .validator import ResponseValidator, InputValidator
+from .validator import ResponseValidator, InputValidator, ValidationContext
 
-__all__ = ['ResponseValidator', 'InputValidator']
\ No newline at end of file
+__all__ = ['ResponseValidator', 'InputValidator', 'ValidationContext']
\ No newline at end of file
@@ -1,29 +1,135 @@
 import re
+import functools
 #from typing import Dict, List, Tuple
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, FrozenSet, List, Tuple, Optional
+from dataclasses import dataclass
 
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
 from observability.logger import logger
 
+# Citation patterns fused into one alternation so the response is scanned once:
+# [file.md] | (file.py) | "file.js" | `file.ts`
+_CITATION_PATTERN = re.compile(
+    r'\[([\w\-./]+\.\w+)\]'
+    r'|\(([\w\-./]+\.\w+)\)'
+    r'|"([\w\-./]+\.\w+)"'
+    r'|`([\w\-./]+\.\w+)`'
+)
+
+# Basic SQL injection patterns, fused into one alternation
+_SQL_PATTERN = re.compile(
+    r";\s*DROP\s+TABLE"
+    r"|;\s*DELETE\s+FROM"
+    r"|UNION\s+SELECT"
+    r"|--\s*$",
+    re.IGNORECASE
+)
+
+@functools.lru_cache(maxsize=1024)
+def _detect_injection(query: str) -> Optional[str]:
+    """
+    Detect injection attempts in a query
+    
+    Returns:
+        "sql" or "script" if an injection pattern matched, otherwise None
+    """
+    # Check for SQL injection patterns (basic). Not prefiltered with
+    # str.lower(): IGNORECASE also folds characters such as 'ı' and 'ſ'
+    if _SQL_PATTERN.search(query):
+        return "sql"
+    
+    # Check for script injection
+    query_lower = query.lower()
+    if "<script" in query_lower or "javascript:" in query_lower:
+        return "script"
+    
+    return None
+
+@functools.lru_cache(maxsize=4096)
+def _parse_commit_date(commit_date: str) -> datetime:
+    """
+    Parse an ISO commit date as UTC (memoized; many chunks share the same commit)
+    
+    Naive timestamps, as returned by the TIMESTAMP column, are taken to be UTC.
+    """
+    parsed = datetime.fromisoformat(commit_date.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+@dataclass(frozen=True)
+class ValidationContext:
+    """Lookups over a retrieved chunk set, reusable across candidate responses"""
+    paths: FrozenSet[str]
+    path_to_parsed_date: Dict[str, datetime]
+
 class ResponseValidator:
     """Validates LLM responses for quality and correctness"""
     
     def __init__(self):
         self.max_staleness_days = 180  # Flag docs older than 6 months
     
-    def validate(
+    def prepare_context(self, retrieved_chunks: List[Dict]) -> ValidationContext:
+        """
+        Precompute citation lookups for a set of retrieved chunks
+        
+        Args:
+            retrieved_chunks: Context chunks used
+        
+        Returns:
+            ValidationContext to pass to validate()
+        """
+        paths = set()
+        path_to_parsed_date = {}
+        
+        # The first chunk retrieved for a path determines its commit date
+        for chunk in retrieved_chunks:
+            file_path = chunk['file_path']
+            if file_path in paths:
+                continue
+            paths.add(file_path)
+            
+            if chunk.get('commit_date'):
+                try:
+                    path_to_parsed_date[file_path] = _parse_commit_date(chunk['commit_date'])
+                except Exception as e:
+                    logger.warning("Failed to parse commit date", error=str(e))
+        
+        return ValidationContext(
+            paths=frozenset(paths),
+            path_to_parsed_date=path_to_parsed_date
+        )
+    
+    def validate_once(
         self,
         response: str,
         retrieved_chunks: List[Dict]
     ) -> Tuple[bool, List[str], List[str]]:
         """
-        Validate LLM response
+        Validate a single LLM response against its context chunks
         
         Args:
             response: LLM generated response
             retrieved_chunks: Context chunks used
         
+        Returns:
+            Tuple of (is_valid, errors, warnings)
+        """
+        return self.validate(response, self.prepare_context(retrieved_chunks))
+    
+    def validate(
+        self,
+        response: str,
+        context: ValidationContext
+    ) -> Tuple[bool, List[str], List[str]]:
+        """
+        Validate LLM response
+        
+        Args:
+            response: LLM generated response
+            context: Prepared context from prepare_context()
+        
         Returns:
             Tuple of (is_valid, errors, warnings)
         """
@@ -35,27 +141,22 @@ class ResponseValidator:
         if not citations:
             errors.append("Response has no citations")
         
-        # Check 2: All citations must exist in retrieved context
-        valid_paths = {chunk['file_path'] for chunk in retrieved_chunks}
-        
+        now = datetime.now(timezone.utc)
         for citation in citations:
-            if citation not in valid_paths:
+            # Check 2: All citations must exist in retrieved context
+            if citation not in context.paths:
                 errors.append(f"Hallucinated citation: {citation}")
-        
-        # Check 3: Check for stale information
-        for citation in citations:
-            chunk = next((c for c in retrieved_chunks if c['file_path'] == citation), None)
-            if chunk and chunk.get('commit_date'):
-                try:
-                    commit_date = datetime.fromisoformat(chunk['commit_date'].replace('Z', '+00:00'))
-                    age_days = (datetime.now(commit_date.tzinfo) - commit_date).days
-                    
-                    if age_days > self.max_staleness_days:
-                        warnings.append(
-                            f"{citation} is {age_days} days old (last updated: {commit_date.date()})"
-                        )
-                except Exception as e:
-                    logger.warning("Failed to parse commit date", error=str(e))
+                continue
+            
+            # Check 3: Check for stale information
+            commit_date = context.path_to_parsed_date.get(citation)
+            if commit_date:
+                age_days = (now - commit_date).days
+                
+                if age_days > self.max_staleness_days:
+                    warnings.append(
+                        f"{citation} is {age_days} days old (last updated: {commit_date.date()})"
+                    )
         
         # Check 4: Response should not be too short (likely error)
         if len(response.strip()) < 20:
@@ -83,28 +184,23 @@ class ResponseValidator:
         
         return is_valid, errors, warnings
     
-    def _extract_citations(self, response: str) -> List[str]:
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def _extract_citations(response: str) -> Tuple[str, ...]:
         """
-        Extract file path citations from response
+        Extract file path citations from response (memoized per response)
         
         Looks for patterns like:
         - [path/to/file.md]
         - (path/to/file.py)
         - "path/to/file.js"
         """
-        patterns = [
-            r'\[([\w\-./]+\.\w+)\]',  # [file.md]
-            r'\(([\w\-./]+\.\w+)\)',  # (file.py)
-            r'"([\w\-./]+\.\w+)"',    # "file.js"
-            r'`([\w\-./]+\.\w+)`',    # `file.ts`
-        ]
-        
-        citations = set()
-        for pattern in patterns:
-            matches = re.findall(pattern, response)
-            citations.update(matches)
+        citations = {
+            next(group for group in match.groups() if group)
+            for match in _CITATION_PATTERN.finditer(response)
+        }
         
-        return list(citations)
+        return tuple(citations)
     
     def add_warnings_to_response(
         self,
@@ -155,21 +251,12 @@ class InputValidator:
         if len(query) > self.max_query_length:
             return False, f"Query too long (maximum {self.max_query_length} characters)"
         
-        # Check for SQL injection patterns (basic)
-        sql_patterns = [
-            r";\s*DROP\s+TABLE",
-            r";\s*DELETE\s+FROM",
-            r"UNION\s+SELECT",
-            r"--\s*$"
-        ]
-        
-        for pattern in sql_patterns:
-            if re.search(pattern, query, re.IGNORECASE):
-                logger.warning("Potential SQL injection detected", query=query[:50])
-                return False, "Invalid query format"
+        injection = _detect_injection(query)
+        if injection == "sql":
+            logger.warning("Potential SQL injection detected", query=query[:50])
+            return False, "Invalid query format"
         
-        # Check for script injection
-        if "<script" in query.lower() or "javascript:" in query.lower():
+        if injection == "script":
             logger.warning("Potential script injection detected", query=query[:50])
             return False, "Invalid query format"
         
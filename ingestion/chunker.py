@@ -1,4 +1,5 @@
 from typing import List
+import os
 import tiktoken
 
 from config.settings import settings
@@ -10,6 +11,7 @@ class TextChunker:
         self.chunk_size = settings.chunking.chunk_size
         self.chunk_overlap = settings.chunking.chunk_overlap
         self.encoding = tiktoken.get_encoding("cl100k_base")
+        self.num_threads = os.cpu_count() or 1
     
     def chunk_text(self, text: str) -> List[str]:
         """
@@ -21,20 +23,43 @@ class TextChunker:
         Returns:
             List of text chunks
         """
-        tokens = self.encoding.encode(text)
+        return self.chunk_batch([text])[0]
+    
+    def chunk_batch(self, texts: List[str]) -> List[List[str]]:
+        """
+        Chunk many texts into overlapping pieces
         
-        if len(tokens) <= self.chunk_size:
-            return [text]
+        All texts are encoded in one multithreaded tiktoken call and all
+        windows are decoded in one more.
         
-        chunks = []
-        start = 0
+        Args:
+            texts: Texts to chunk
         
-        while start < len(tokens):
-            end = start + self.chunk_size
-            chunk_tokens = tokens[start:end]
-            chunk_text = self.encoding.decode(chunk_tokens)
-            chunks.append(chunk_text)
+        Returns:
+            List of text chunks for each input text
+        """
+        token_lists = self.encoding.encode_ordinary_batch(texts, num_threads=self.num_threads)
+        
+        # Slice every window up front, remembering which text each belongs to
+        step = self.chunk_size - self.chunk_overlap
+        windows = []
+        spans = []
+        for tokens in token_lists:
+            if len(tokens) <= self.chunk_size:
+                spans.append(None)
+                continue
             
-            start = end - self.chunk_overlap
+            start_index = len(windows)
+            windows.extend(
+                tokens[start:start + self.chunk_size]
+                for start in range(0, len(tokens), step)
+            )
+            spans.append((start_index, len(windows)))
+        
+        decoded = self.encoding.decode_batch(windows) if windows else []
         
-        return chunks
\ No newline at end of file
+        # Texts that fit in a single chunk are returned unchanged
+        return [
+            [text] if span is None else decoded[span[0]:span[1]]
+            for text, span in zip(texts, spans)
+        ]
\ No newline at end of file
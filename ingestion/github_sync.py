@@ -1,13 +1,22 @@
+import os
+import re
 import subprocess
+import time
 from pathlib import Path
-from typing import List
-from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from datetime import datetime, timezone
 import fnmatch
 
 from config.settings import settings
 from observability.logger import logger
 from observability.metrics import SyncMetrics, metrics_collector
 
+# File types the parser knows how to extract content from
+_SUFFIXES = frozenset({'.md', '.py', '.js', '.java', '.go', '.ts'})
+
+# Fast-forward summary line printed by `git pull`
+_PULL_UPDATE_RE = re.compile(r"^Updating ([0-9a-f]+)\.\.([0-9a-f]+)", re.MULTILINE)
+
 class GitHubSyncer:
     """Handles GitHub repository syncing"""
     
@@ -15,6 +24,7 @@ class GitHubSyncer:
         self.github_token = settings.github.token
         self.clone_dir = settings.github.clone_dir
         self.clone_dir.mkdir(parents=True, exist_ok=True)
+        self._exclude_re = self._compile_exclusions(settings.github.excluded_patterns)
     
     def sync_repo(self, repo: str) -> SyncMetrics:
         """
@@ -26,18 +36,24 @@ class GitHubSyncer:
         Returns:
             SyncMetrics with sync results
         """
-        start_time = datetime.utcnow()
-        metrics = SyncMetrics(repo=repo, start_time=start_time, end_time=start_time)
+        start_ns = time.time_ns()
+        metrics = SyncMetrics(repo=repo, start_ns=start_ns, end_ns=start_ns)
         
         with logger.operation("github_sync", repo=repo):
             try:
                 repo_path = self._get_repo_path(repo)
                 
-                if repo_path.exists():
+                pulled = repo_path.exists()
+                if pulled:
                     self._pull_repo(repo_path, metrics)
                 else:
                     self._clone_repo(repo, repo_path, metrics)
                 
+                # Full HEAD hash, resolved once per sync for index_repo
+                metrics.after_hash = self._get_commit_hash(repo_path)
+                if pulled and metrics.before_hash is None:
+                    metrics.before_hash = metrics.after_hash
+                
                 files = self._get_files_to_process(repo_path)
                 metrics.files_processed = len(files)
                 
@@ -52,7 +68,7 @@ class GitHubSyncer:
                 logger.error("Sync failed", repo=repo, error=str(e))
                 raise
             finally:
-                metrics.end_time = datetime.utcnow()
+                metrics.end_ns = time.time_ns()
                 metrics_collector.record_sync(metrics)
         
         return metrics
@@ -86,23 +102,24 @@ class GitHubSyncer:
         logger.info("Pulling repository", path=str(repo_path))
         
         try:
-            before_hash = self._get_commit_hash(repo_path)
-            
-            subprocess.run(
-                ["git", "-C", str(repo_path), "pull"],
+            # A fast-forward prints "Updating <before>..<after>", so one git
+            # call tells us whether anything changed
+            result = subprocess.run(
+                ["git", "-C", str(repo_path), "pull", "--ff-only"],
                 check=True,
                 capture_output=True,
-                text=True
+                text=True,
+                env={**os.environ, "LC_ALL": "C"}
             )
             
-            after_hash = self._get_commit_hash(repo_path)
-            
-            if before_hash != after_hash:
+            update = _PULL_UPDATE_RE.search(result.stdout)
+            if update:
+                metrics.before_hash = update.group(1)
                 logger.info(
                     "Repository updated",
                     path=str(repo_path),
-                    before=before_hash[:7],
-                    after=after_hash[:7]
+                    before=update.group(1)[:7],
+                    after=update.group(2)[:7]
                 )
             else:
                 logger.info("Repository already up to date", path=str(repo_path))
@@ -122,37 +139,161 @@ class GitHubSyncer:
         )
         return result.stdout.strip()
     
+    def _get_changed_files(
+        self,
+        repo_path: Path,
+        before_hash: str,
+        after_hash: str
+    ) -> Optional[Set[str]]:
+        """
+        Get paths changed between two commits
+        
+        Renames are listed as their old and new paths, so chunks of the old
+        path can be dropped.
+        
+        Args:
+            repo_path: Local repository path
+            before_hash: Older commit, e.g. the last one indexed
+            after_hash: Newer commit, e.g. HEAD after the pull
+        
+        Returns:
+            Set of changed file paths relative to the repo root, or None if
+            the diff could not be computed
+        """
+        if before_hash == after_hash:
+            return set()
+        
+        try:
+            result = subprocess.run(
+                [
+                    "git", "-C", str(repo_path),
+                    "-c", "core.quotePath=false",
+                    "diff", "--name-only", "--no-renames", f"{before_hash}..{after_hash}"
+                ],
+                check=True,
+                capture_output=True,
+                text=True
+            )
+        except subprocess.CalledProcessError as e:
+            logger.warning("Failed to diff commits", path=str(repo_path), error=e.stderr)
+            return None
+        
+        return {line for line in result.stdout.splitlines() if line}
+    
     def _get_files_to_process(self, repo_path: Path) -> List[Path]:
         """Get list of files to process based on config"""
         files = []
+        max_size = settings.github.max_file_size_mb * 1024 * 1024
         
-        for file_path in repo_path.rglob("*"):
-            if not file_path.is_file():
+        for entry, relative_path in self._scan_files(str(repo_path), ""):
+            if os.path.splitext(entry.name)[1] not in _SUFFIXES:
                 continue
             
-            relative_path = file_path.relative_to(repo_path)
-            if self._should_exclude(str(relative_path)):
+            if self._should_exclude(relative_path):
                 continue
             
-            if file_path.stat().st_size > settings.github.max_file_size_mb * 1024 * 1024:
+            size = entry.stat(follow_symlinks=False).st_size
+            if size > max_size:
                 logger.warning(
                     "File too large, skipping",
-                    file=str(relative_path),
-                    size_mb=round(file_path.stat().st_size / (1024 * 1024), 2)
+                    file=relative_path,
+                    size_mb=round(size / (1024 * 1024), 2)
                 )
                 continue
             
-            if file_path.suffix in ['.md', '.py', '.js', '.java', '.go', '.ts']:
-                files.append(file_path)
+            files.append(Path(entry.path))
         
         return files
     
+    def _scan_files(self, directory: str, prefix: str) -> Iterator[Tuple[os.DirEntry, str]]:
+        """
+        Recursively yield regular files under a directory
+        
+        Excluded directories are pruned instead of being walked.
+        
+        Args:
+            directory: Directory to scan
+            prefix: Path of the directory relative to the repo root
+        
+        Yields:
+            Tuples of (DirEntry, relative path)
+        """
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                relative_path = prefix + entry.name
+                
+                if entry.is_dir(follow_symlinks=False):
+                    if not self._should_exclude(relative_path + "/"):
+                        yield from self._scan_files(entry.path, relative_path + "/")
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry, relative_path
+    
+    @staticmethod
+    def _compile_exclusions(patterns: List[str]) -> re.Pattern:
+        """
+        Fuse exclusion patterns into one regex
+        
+        A path is excluded if it matches a pattern as a glob or contains it
+        as a substring.
+        """
+        if not patterns:
+            return re.compile(r"(?!)")
+        
+        globs = (rf"\A(?:{fnmatch.translate(pattern)})" for pattern in patterns)
+        substrings = (re.escape(pattern) for pattern in patterns)
+        return re.compile("|".join([*globs, *substrings]))
+    
     def _should_exclude(self, path: str) -> bool:
         """Check if path matches exclusion patterns"""
-        for pattern in settings.github.excluded_patterns:
-            if fnmatch.fnmatch(path, pattern) or pattern in path:
-                return True
-        return False
+        return self._exclude_re.search(path) is not None
+    
+    def _build_metadata_index(self, repo_path: Path) -> Dict[str, dict]:
+        """
+        Map every tracked file to the metadata of its latest commit
+        
+        Uses a single `git log --name-only` pass instead of one `git log`
+        per file.
+        
+        Args:
+            repo_path: Local repository path
+        
+        Returns:
+            Dict of relative file path -> commit metadata
+        """
+        index = {}
+        
+        process = subprocess.Popen(
+            [
+                "git", "-C", str(repo_path),
+                "-c", "core.quotePath=false",
+                "log", "--name-only", "--format=\x1e%H|%ad|%an|%ae",
+                "--date=iso-strict"
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True
+        )
+        
+        metadata = None
+        with process.stdout:
+            for line in process.stdout:
+                line = line.rstrip("\n")
+                
+                if line.startswith("\x1e"):
+                    commit_hash, date, author_name, author_email = line[1:].split("|", 3)
+                    metadata = {
+                        "commit_hash": commit_hash,
+                        "commit_date": date,
+                        "author": f"{author_name} <{author_email}>"
+                    }
+                elif line and metadata is not None:
+                    # Log is newest first, so keep the first commit seen per path
+                    index.setdefault(line, metadata)
+        
+        if process.wait() != 0:
+            logger.warning("Failed to build metadata index", path=str(repo_path))
+        
+        return index
     
     def get_file_metadata(self, repo_path: Path, file_path: Path) -> dict:
         """Get git metadata for a file"""
@@ -181,6 +322,6 @@ class GitHubSyncer:
         
         return {
             "commit_hash": "unknown",
-            "commit_date": datetime.utcnow().isoformat(),
+            "commit_date": datetime.now(timezone.utc).isoformat(),
             "author": "unknown"
         }
\ No newline at end of file
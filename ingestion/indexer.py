@@ -1,6 +1,9 @@
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
+import functools
 import hashlib
+import os
 
 from ingestion.github_sync import GitHubSyncer
 from ingestion.parser import ContentParser
@@ -10,13 +13,113 @@ from storage.db import VectorDB
 from observability.logger import logger
 from observability.metrics import SyncMetrics, metrics_collector
 
+@functools.lru_cache(maxsize=None)
+def _worker_components() -> Tuple[ContentParser, GitHubSyncer]:
+    """Build parser and syncer once per worker process"""
+    return ContentParser(), GitHubSyncer()
+
+def _parse_file(
+    repo_path: Path,
+    file_path: Path,
+    metadata: Optional[Dict] = None
+) -> Optional[Tuple[str, Dict]]:
+    """
+    Parse a single file and resolve its git metadata
+    
+    Runs inside a worker process, so it is a module-level function.
+    
+    Args:
+        repo_path: Local repository path
+        file_path: File to parse
+        metadata: Commit metadata from the bulk git log, if available
+    
+    Returns:
+        Tuple of (content, metadata), or None if the file has no content
+    """
+    parser, syncer = _worker_components()
+    
+    # Parse file content
+    content = parser.parse_file(file_path)
+    if not content:
+        return None
+    
+    # Fall back to a per-file git lookup when the bulk index missed this file
+    if metadata is None:
+        metadata = syncer.get_file_metadata(repo_path, file_path)
+    
+    return content, metadata
+
+def _build_chunks(
+    repo: str,
+    repo_path: Path,
+    file_path: Path,
+    metadata: Dict,
+    text_chunks: List[str]
+) -> List[Dict]:
+    """
+    Build chunk dictionaries for one file
+    
+    Args:
+        repo: Repository name
+        repo_path: Local repository path
+        file_path: File the chunks came from
+        metadata: Commit metadata for the file
+        text_chunks: Chunked file content
+    
+    Returns:
+        List of chunk dictionaries
+    """
+    relative_path = file_path.relative_to(repo_path)
+    
+    # Generate unique chunk IDs
+    chunk_ids = _generate_chunk_ids(repo, str(relative_path), len(text_chunks))
+    
+    # Create chunk objects
+    chunks = []
+    for chunk_id, text in zip(chunk_ids, text_chunks):
+        # Build GitHub URL
+        github_url = f"https://github.com/{repo}/blob/main/{relative_path}"
+        
+        chunk = {
+            'chunk_id': chunk_id,
+            'repo_name': repo,
+            'file_path': str(relative_path).replace('\\', '/'),
+            'file_type': file_path.suffix.lstrip('.'),
+            'text': text,
+            'commit_hash': metadata['commit_hash'],
+            'commit_date': metadata['commit_date'],
+            'author': metadata['author'],
+            'github_url': github_url
+        }
+        
+        chunks.append(chunk)
+    
+    return chunks
+
+def _generate_chunk_ids(repo: str, file_path: str, count: int) -> List[str]:
+    """
+    Generate unique chunk IDs for the chunks of one file
+    
+    IDs are md5("{repo}::{file_path}::{index}"); the shared prefix is hashed
+    once and the hasher state copied per chunk.
+    """
+    prefix = hashlib.md5(f"{repo}::{file_path}::".encode())
+    
+    chunk_ids = []
+    for chunk_index in range(count):
+        hasher = prefix.copy()
+        hasher.update(str(chunk_index).encode())
+        chunk_ids.append(hasher.hexdigest())
+    
+    return chunk_ids
+
 class DocumentIndexer:
     """Indexes documents from GitHub into vector database"""
     
     def __init__(self):
         self.syncer = GitHubSyncer()
-        self.parser = ContentParser()
         self.chunker = TextChunker()
+        self.max_workers = os.cpu_count()
         self.embedder = Embedder()
         self.db = VectorDB()
     
@@ -42,24 +145,74 @@ class DocumentIndexer:
             repo_path = self.syncer._get_repo_path(repo)
             files = self.syncer._get_files_to_process(repo_path)
             
+            # Only reprocess files changed since the last complete indexing run;
+            # a pull alone is no guarantee its changes made it into the index
+            head_hash = metrics.after_hash
+            indexed_hash = self.db.get_indexed_commit(repo)
+            
+            changed = None
+            if indexed_hash:
+                changed = self.syncer._get_changed_files(repo_path, indexed_hash, head_hash)
+            
+            if changed is not None:
+                changed_files = [
+                    file_path for file_path in files
+                    if file_path.relative_to(repo_path).as_posix() in changed
+                ]
+                metrics.files_skipped = len(files) - len(changed_files)
+                files = changed_files
+                
+                logger.info(
+                    "Incremental indexing",
+                    repo=repo,
+                    changed=len(files),
+                    skipped=metrics.files_skipped
+                )
+            
+            # Resolve commit metadata for every file with one git invocation
+            metadata_index = self.syncer._build_metadata_index(repo_path)
+            
             logger.info("Starting indexing", repo=repo, files=len(files))
             
-            # Step 3: Process files in batches
+            # Step 3: Parse files in parallel
+            parsed = []
+            
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = [
+                    executor.submit(
+                        _parse_file,
+                        repo_path,
+                        file_path,
+                        metadata_index.get(file_path.relative_to(repo_path).as_posix())
+                    )
+                    for file_path in files
+                ]
+                
+                for file_path, future in zip(files, futures):
+                    try:
+                        result = future.result()
+                        if result is not None:
+                            parsed.append((file_path, *result))
+                        
+                    except Exception as e:
+                        logger.error(
+                            "Failed to process file",
+                            repo=repo,
+                            file=str(file_path.relative_to(repo_path)),
+                            error=str(e)
+                        )
+                        metrics.errors.append(f"{file_path.name}: {str(e)}")
+            
+            # Chunk every file with one batched tokenizer call
             all_chunks = []
             
-            for file_path in files:
-                try:
-                    chunks = self._process_file(repo, repo_path, file_path)
-                    all_chunks.extend(chunks)
-                    
-                except Exception as e:
-                    logger.error(
-                        "Failed to process file",
-                        repo=repo,
-                        file=str(file_path.relative_to(repo_path)),
-                        error=str(e)
+            if parsed:
+                chunked = self.chunker.chunk_batch([content for _, content, _ in parsed])
+                
+                for (file_path, _, metadata), text_chunks in zip(parsed, chunked):
+                    all_chunks.extend(
+                        _build_chunks(repo, repo_path, file_path, metadata, text_chunks)
                     )
-                    metrics.errors.append(f"{file_path.name}: {str(e)}")
             
             # Step 4: Generate embeddings in batches
             if all_chunks:
@@ -71,7 +224,22 @@ class DocumentIndexer:
                 # Add embeddings to chunks
                 for chunk, embedding in zip(all_chunks, embeddings):
                     chunk['embedding'] = embedding
-                
+            
+            # Chunks of deleted, renamed-away or shrunken files are not replaced
+            # by the upsert, so drop them first
+            if changed is None:
+                stale_count = self.db.delete_chunks_except(
+                    repo, [chunk['chunk_id'] for chunk in all_chunks]
+                )
+            elif changed:
+                stale_count = self.db.delete_files(repo, sorted(changed))
+            else:
+                stale_count = 0
+            
+            if stale_count:
+                logger.info("Deleted stale chunks", repo=repo, count=stale_count)
+            
+            if all_chunks:
                 # Step 5: Store in database
                 logger.info("Storing chunks in database", count=len(all_chunks))
                 stored_count = self.db.upsert_chunks(all_chunks)
@@ -86,64 +254,10 @@ class DocumentIndexer:
             else:
                 logger.warning("No chunks created", repo=repo)
             
-            return metrics
-    
-    def _process_file(
-        self,
-        repo: str,
-        repo_path: Path,
-        file_path: Path
-    ) -> List[Dict]:
-        """
-        Process a single file into chunks
-        
-        Args:
-            repo: Repository name
-            repo_path: Local repository path
-            file_path: File to process
-        
-        Returns:
-            List of chunk dictionaries
-        """
-        relative_path = file_path.relative_to(repo_path)
-        
-        # Parse file content
-        content = self.parser.parse_file(file_path)
-        if not content:
-            return []
-        
-        # Get file metadata from git
-        metadata = self.syncer.get_file_metadata(repo_path, file_path)
-        
-        # Chunk the content
-        text_chunks = self.chunker.chunk_text(content)
-        
-        # Create chunk objects
-        chunks = []
-        for i, text in enumerate(text_chunks):
-            # Generate unique chunk ID
-            chunk_id = self._generate_chunk_id(repo, str(relative_path), i)
-            
-            # Build GitHub URL
-            github_url = f"https://github.com/{repo}/blob/main/{relative_path}"
-            
-            chunk = {
-                'chunk_id': chunk_id,
-                'repo_name': repo,
-                'file_path': str(relative_path).replace('\\', '/'),
-                'file_type': file_path.suffix.lstrip('.'),
-                'text': text,
-                'commit_hash': metadata['commit_hash'],
-                'commit_date': metadata['commit_date'],
-                'author': metadata['author'],
-                'github_url': github_url
-            }
-            
-            chunks.append(chunk)
-        
-        return chunks
-    
-    def _generate_chunk_id(self, repo: str, file_path: str, chunk_index: int) -> str:
-        """Generate unique chunk ID"""
-        content = f"{repo}::{file_path}::{chunk_index}"
-        return hashlib.md5(content.encode()).hexdigest()
\ No newline at end of file
+            # Stored chunks are committed; a run with errors forces a full reindex next time
+            self.db.set_indexed_commit(repo, None if metrics.errors else head_hash)
+            
+            if all_chunks or stale_count:
+                self.db.refresh_stats()
+            
+            return metrics
\ No newline at end of file
@@ -1,8 +1,18 @@
+import mmap
+import re
 from pathlib import Path
 from typing import Optional
 
 from observability.logger import logger
 
+# Docstrings (triple-quoted blocks) and full-line # or // comments
+_CODE_EXTRACT = re.compile(
+    rb'"""[\s\S]*?"""'
+    rb"|'''[\s\S]*?'''"
+    rb'|^[ \t]*(?:#|//)[^\n]*',
+    re.MULTILINE
+)
+
 class ContentParser:
     """Extracts content from different file types"""
     
@@ -40,32 +50,14 @@ class ContentParser:
     
     def _parse_code(self, file_path: Path) -> str:
         """Parse code file - extract docstrings and comments"""
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            lines = f.readlines()
+        if file_path.stat().st_size == 0:
+            return ""
         
-        extracted_content = []
-        in_docstring = False
-        docstring_lines = []
-        
-        for line in lines:
-            stripped = line.strip()
-            
-            if '"""' in stripped or "'''" in stripped:
-                if not in_docstring:
-                    in_docstring = True
-                    docstring_lines = [stripped]
-                else:
-                    docstring_lines.append(stripped)
-                    extracted_content.append("\n".join(docstring_lines))
-                    in_docstring = False
-                    docstring_lines = []
-            elif in_docstring:
-                docstring_lines.append(stripped)
-            elif stripped.startswith('#') or stripped.startswith('//'):
-                extracted_content.append(stripped)
+        # Scan the mapped file directly instead of copying it onto the heap
+        with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            extracted = b"\n".join(match.strip() for match in _CODE_EXTRACT.findall(mm))
         
-        result = "\n".join(extracted_content)
-        if not result.strip():
-            result = "".join(lines[:50])
+            if not extracted.strip():
+                extracted = b"".join(mm.readline() for _ in range(50))
         
-        return result
\ No newline at end of file
+        return extracted.decode('utf-8', errors='ignore').replace('\r\n', '\n')
\ No newline at end of file
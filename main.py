@@ -18,12 +18,13 @@ def index_repos():
         try:
             metrics = indexer.index_repo(repo)
             logger.info(
-                f"Indexing completed for {repo}",
+                "Indexing completed for %s",
+                repo,
                 files=metrics.files_processed,
                 chunks=metrics.chunks_created
             )
         except Exception as e:
-            logger.error(f"Failed to index {repo}", error=str(e))
+            logger.error("Failed to index %s", repo, error=str(e))
     
     # Print summary
     db = VectorDB()
@@ -43,12 +44,26 @@ def query_docs(question: str):
     """Query documentation with real retrieval"""
     orchestrator = LLMOrchestrator()
     
-    result = orchestrator.query(question)
-    
     print("\n" + "="*60)
     print("RESPONSE")
     print("="*60)
-    print(result["response"])
+    
+    # Print the answer as it streams, then whatever was added after (e.g. warnings)
+    streamed = []
+    def print_token(token: str):
+        streamed.append(token)
+        print(token, end="", flush=True)
+    
+    result = orchestrator.query(question, on_token=print_token)
+    
+    response = result["response"]
+    streamed_text = "".join(streamed)
+    if streamed_text and response.startswith(streamed_text):
+        print(response[len(streamed_text):])
+    else:
+        if streamed_text:
+            print()
+        print(response)
     
     print("\n" + "="*60)
     print("CITATIONS")
@@ -63,22 +78,28 @@ def query_docs(question: str):
     print("VALIDATION")
     print("="*60)
     validation = result["validation"]
+    errors = validation['errors']
+    warnings = validation['warnings']
     print(f"  Valid: {validation['is_valid']}")
-    if validation['errors']:
-        print(f"  Errors: {', '.join(validation['errors'])}")
-    if validation['warnings']:
-        print(f"  Warnings:")
-        for warning in validation['warnings']:
-            print(f"    - {warning}")
+    if errors:
+        print(f"  Errors: {', '.join(errors)}")
+    if warnings:
+        print("  Warnings:\n" + "\n".join(f"    - {warning}" for warning in warnings))
     
     print("\n" + "="*60)
     print("METRICS")
     print("="*60)
     metrics = result["metrics"]
-    print(f"  Duration: {metrics.get('duration_ms', 0)}ms")
-    print(f"  Tokens: {metrics.get('tokens_used', 0)}")
-    print(f"  Cost: ${metrics.get('cost_usd', 0):.4f}")
-    print(f"  Chunks retrieved: {metrics.get('chunks_retrieved', 0)}")
+    duration_ms = metrics.get('duration_ms', 0)
+    tokens_used = metrics.get('tokens_used', 0)
+    cost_usd = metrics.get('cost_usd', 0)
+    chunks_retrieved = metrics.get('chunks_retrieved', 0)
+    print(
+        f"  Duration: {duration_ms}ms\n"
+        f"  Tokens: {tokens_used}\n"
+        f"  Cost: ${cost_usd:.4f}\n"
+        f"  Chunks retrieved: {chunks_retrieved}"
+    )
 
 def show_stats():
     """Show database statistics"""
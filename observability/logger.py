@@ -1,11 +1,47 @@
+import atexit
+import itertools
 import json
 import logging
+import logging.handlers
+import os
+import queue
+import socket
 import time
 from pathlib import Path
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, timezone
 from contextlib import contextmanager
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Static per-process fields, resolved once instead of per record
+_HOST = socket.gethostname()
+
+def _dumps(value) -> str:
+    """Serialize a value to JSON text"""
+    if orjson:
+        return orjson.dumps(value, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(value, separators=(",", ":"))
+
+# Every record starts with the same fields, so fill a template instead of
+# serializing a dict; extra fields are spliced in after it
+_RECORD_TEMPLATE = (
+    '{{"timestamp":"{timestamp}","level":"{level}","logger":{logger},'
+    '"message":{message},"host":{host},"pid":{pid}'
+)
+_HOST_JSON = _dumps(_HOST)
+_TEMPLATE_KEYS = frozenset(("timestamp", "level", "logger", "message", "host", "pid"))
+
+# Monotonic source of operation IDs
+_operation_ids = itertools.count(1)
+
+# Process start time; with the pid it keeps operation IDs unique across the
+# processes (CLI runs, parse workers) that share a log
+_PROCESS_START_NS = time.time_ns()
+
 class StructuredLogger:
     """JSON structured logging for observability"""
     
@@ -15,55 +51,103 @@ class StructuredLogger:
         
         console_handler = logging.StreamHandler()
         console_handler.setFormatter(self._json_formatter())
-        self.logger.addHandler(console_handler)
+        self._handlers = [console_handler]
         
         if log_file:
             log_file.parent.mkdir(parents=True, exist_ok=True)
             file_handler = logging.FileHandler(log_file)
             file_handler.setFormatter(self._json_formatter())
-            self.logger.addHandler(file_handler)
+            self._handlers.append(file_handler)
+        
+        # Format and write on a background thread so callers never block on I/O
+        self._queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+        self.logger.addHandler(self._queue_handler)
+        self._listener = logging.handlers.QueueListener(
+            self._queue_handler.queue,
+            *self._handlers,
+            respect_handler_level=True
+        )
+        self._listener.start()
+        atexit.register(self._listener.stop)
+        
+        # A forked child (e.g. an indexer worker) has no listener thread
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._log_directly)
+    
+    def _log_directly(self):
+        """Swap the queue handler for the real handlers"""
+        self.logger.removeHandler(self._queue_handler)
+        for handler in self._handlers:
+            self.logger.addHandler(handler)
     
     def _json_formatter(self):
         """Create JSON formatter"""
         class JSONFormatter(logging.Formatter):
             def format(self, record):
-                log_data = {
-                    "timestamp": datetime.utcnow().isoformat() + "Z",
-                    "level": record.levelname,
-                    "logger": record.name,
-                    "message": record.getMessage(),
-                }
+                # Event time; this runs on the listener thread, possibly much later
+                timestamp = datetime.fromtimestamp(record.created, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+                message = record.getMessage()
+                extra = getattr(record, "extra", None)
+                
+                # Extra fields named like a standard one override it, as in a dict merge
+                if extra and not _TEMPLATE_KEYS.isdisjoint(extra):
+                    log_data = {
+                        "timestamp": timestamp,
+                        "level": record.levelname,
+                        "logger": record.name,
+                        "message": message,
+                        "host": _HOST,
+                        "pid": record.process,
+                    }
+                    log_data.update(extra)
+                    return _dumps(log_data)
+                
+                prefix = _RECORD_TEMPLATE.format(
+                    timestamp=timestamp,
+                    level=record.levelname,
+                    logger=_dumps(record.name),
+                    message=_dumps(message),
+                    host=_HOST_JSON,
+                    pid=record.process
+                )
                 
-                if hasattr(record, "extra"):
-                    log_data.update(record.extra)
+                if extra:
+                    return prefix + "," + _dumps(extra)[1:]
                 
-                return json.dumps(log_data)
+                return prefix + "}"
         
         return JSONFormatter()
     
-    def info(self, message: str, **kwargs):
+    def info(self, message: str, *args, **kwargs):
         """Log info with extra fields"""
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
         extra = {"extra": kwargs} if kwargs else {}
-        self.logger.info(message, extra=extra)
+        self.logger.info(message, *args, extra=extra)
     
-    def error(self, message: str, **kwargs):
+    def error(self, message: str, *args, **kwargs):
         """Log error with extra fields"""
+        if not self.logger.isEnabledFor(logging.ERROR):
+            return
         extra = {"extra": kwargs} if kwargs else {}
-        self.logger.error(message, extra=extra)
+        self.logger.error(message, *args, extra=extra)
     
-    def warning(self, message: str, **kwargs):
+    def warning(self, message: str, *args, **kwargs):
         """Log warning with extra fields"""
+        if not self.logger.isEnabledFor(logging.WARNING):
+            return
         extra = {"extra": kwargs} if kwargs else {}
-        self.logger.warning(message, extra=extra)
+        self.logger.warning(message, *args, extra=extra)
     
     @contextmanager
     def operation(self, operation_name: str, **context):
         """Context manager for timing operations"""
-        start_time = time.time()
-        op_id = f"{operation_name}_{int(start_time * 1000)}"
+        start_ns = time.perf_counter_ns()
+        op_id = f"{operation_name}_{os.getpid():x}-{_PROCESS_START_NS:x}-{next(_operation_ids)}"
         
         self.info(
-            f"Starting {operation_name}",
+            "Starting %s",
+            operation_name,
             operation=operation_name,
             operation_id=op_id,
             **context
@@ -71,9 +155,10 @@ class StructuredLogger:
         
         try:
             yield op_id
-            duration = time.time() - start_time
+            duration = (time.perf_counter_ns() - start_ns) / 1e9
             self.info(
-                f"Completed {operation_name}",
+                "Completed %s",
+                operation_name,
                 operation=operation_name,
                 operation_id=op_id,
                 duration_seconds=round(duration, 3),
@@ -81,9 +166,10 @@ class StructuredLogger:
                 **context
             )
         except Exception as e:
-            duration = time.time() - start_time
+            duration = (time.perf_counter_ns() - start_ns) / 1e9
             self.error(
-                f"Failed {operation_name}",
+                "Failed %s",
+                operation_name,
                 operation=operation_name,
                 operation_id=op_id,
                 duration_seconds=round(duration, 3),
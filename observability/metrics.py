@@ -1,21 +1,32 @@
-from typing import Dict, List
+from collections import deque
+from typing import Deque, Dict, List, Optional
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timezone
 
-@dataclass
+@dataclass(slots=True)
 class SyncMetrics:
     """Metrics for GitHub sync operations"""
     repo: str
-    start_time: datetime
-    end_time: datetime
+    start_ns: int  # Wall-clock time.time_ns()
+    end_ns: int
     files_processed: int = 0
     files_skipped: int = 0
     chunks_created: int = 0
     errors: List[str] = field(default_factory=list)
+    before_hash: Optional[str] = None  # None on a fresh clone
+    after_hash: Optional[str] = None  # Full HEAD hash after the sync
+    
+    @property
+    def start_time(self) -> datetime:
+        return datetime.fromtimestamp(self.start_ns / 1e9, timezone.utc)
+    
+    @property
+    def end_time(self) -> datetime:
+        return datetime.fromtimestamp(self.end_ns / 1e9, timezone.utc)
     
     @property
     def duration_seconds(self) -> float:
-        return (self.end_time - self.start_time).total_seconds()
+        return (self.end_ns - self.start_ns) / 1e9
     
     def to_dict(self) -> Dict:
         return {
@@ -26,25 +37,36 @@ class SyncMetrics:
             "files_processed": self.files_processed,
             "files_skipped": self.files_skipped,
             "chunks_created": self.chunks_created,
+            "before_hash": self.before_hash,
+            "after_hash": self.after_hash,
             "error_count": len(self.errors),
             "errors": self.errors[:5]
         }
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class QueryMetrics:
     """Metrics for query operations"""
     query: str
-    start_time: datetime
-    end_time: datetime
+    start_ns: int  # Wall-clock time.time_ns()
+    end_ns: int
     chunks_retrieved: int = 0
     llm_model: str = ""
     tokens_used: int = 0
     cost_usd: float = 0.0
     citations: List[str] = field(default_factory=list)
+    cache_hit: bool = False
+    
+    @property
+    def start_time(self) -> datetime:
+        return datetime.fromtimestamp(self.start_ns / 1e9, timezone.utc)
+    
+    @property
+    def end_time(self) -> datetime:
+        return datetime.fromtimestamp(self.end_ns / 1e9, timezone.utc)
     
     @property
     def duration_ms(self) -> int:
-        return int((self.end_time - self.start_time).total_seconds() * 1000)
+        return (self.end_ns - self.start_ns) // 1_000_000
     
     def to_dict(self) -> Dict:
         return {
@@ -57,34 +79,45 @@ class QueryMetrics:
             "tokens_used": self.tokens_used,
             "cost_usd": round(self.cost_usd, 4),
             "citation_count": len(self.citations),
-            "citations": self.citations
+            "citations": self.citations,
+            "cache_hit": self.cache_hit
         }
 
 class MetricsCollector:
     """Simple in-memory metrics collector"""
     
-    def __init__(self):
-        self.sync_metrics: List[SyncMetrics] = []
-        self.query_metrics: List[QueryMetrics] = []
+    def __init__(self, max_records: int = 10_000):
+        # Only the most recent records are kept; query totals are running
+        # aggregates so they cover every recorded query
+        self.sync_metrics: Deque[SyncMetrics] = deque(maxlen=max_records)
+        self.query_metrics: Deque[QueryMetrics] = deque(maxlen=max_records)
+        self._sync_count = 0
+        self._query_count = 0
+        self._total_latency_ms = 0
+        self._total_cost = 0.0
     
     def record_sync(self, metrics: SyncMetrics):
         self.sync_metrics.append(metrics)
+        self._sync_count += 1
     
     def record_query(self, metrics: QueryMetrics):
         self.query_metrics.append(metrics)
+        self._query_count += 1
+        self._total_latency_ms += metrics.duration_ms
+        self._total_cost += metrics.cost_usd
     
     def get_summary(self) -> Dict:
+        # SyncMetrics are still filled in by the indexer after being recorded,
+        # so file/chunk totals are summed over the retained syncs
         return {
-            "total_syncs": len(self.sync_metrics),
-            "total_queries": len(self.query_metrics),
+            "total_syncs": self._sync_count,
+            "total_queries": self._query_count,
             "total_files_processed": sum(m.files_processed for m in self.sync_metrics),
             "total_chunks_created": sum(m.chunks_created for m in self.sync_metrics),
             "avg_query_latency_ms": int(
-                sum(m.duration_ms for m in self.query_metrics) / len(self.query_metrics)
-            ) if self.query_metrics else 0,
-            "total_cost_usd": round(
-                sum(m.cost_usd for m in self.query_metrics), 2
-            )
+                self._total_latency_ms / self._query_count
+            ) if self._query_count else 0,
+            "total_cost_usd": round(self._total_cost, 2)
         }
 
 metrics_collector = MetricsCollector()
\ No newline at end of file
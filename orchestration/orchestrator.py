@@ -1,7 +1,12 @@
+import hashlib
 import json
-from typing import Dict, List, Optional
-from datetime import datetime
+import time
+from collections import OrderedDict
+from operator import itemgetter
+from typing import Callable, Dict, List, Optional, Tuple
 import openai
+from openai.types.chat import ChatCompletionMessageToolCall
+from openai.types.chat.chat_completion_message_tool_call import Function
 
 from config.settings import settings
 from observability.logger import logger
@@ -11,6 +16,14 @@ from orchestration.tools import TOOLS, execute_search_codebase
 from retrieval.retriever import HybridRetriever
 from guardrails.validator import ResponseValidator, InputValidator
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Assumes a 60/40 input/output split at $0.0025 / $0.01 per 1K tokens
+_BLENDED_COST_PER_TOKEN = 0.6 * 0.0025 / 1000 + 0.4 * 0.01 / 1000
+
 class LLMOrchestrator:
     """Orchestrates LLM calls with tool usage, retrieval, and guardrails"""
     
@@ -22,12 +35,15 @@ class LLMOrchestrator:
         self.retriever = HybridRetriever()
         self.response_validator = ResponseValidator()
         self.input_validator = InputValidator()
+        self.response_cache_size = settings.llm.response_cache_size
+        self._response_cache: OrderedDict = OrderedDict()
     
     def query(
         self,
         user_query: str,
         repo_name: Optional[str] = None,
-        top_k: int = 5
+        top_k: int = 5,
+        on_token: Optional[Callable[[str], None]] = None
     ) -> Dict:
         """
         Process user query with LLM, retrieval, and guardrails
@@ -36,11 +52,12 @@ class LLMOrchestrator:
             user_query: User's question
             repo_name: Optional repository filter
             top_k: Number of context chunks to retrieve
+            on_token: Optional callback receiving response text as it streams in
         
         Returns:
             Dict with response, citations, validation, and metrics
         """
-        start_time = datetime.utcnow()
+        start_ns = time.time_ns()
         
         # Validate input
         is_valid, error_msg = self.input_validator.validate_query(user_query)
@@ -79,63 +96,48 @@ class LLMOrchestrator:
                         "metrics": {}
                     }
                 
-                # Create prompt with context
-                user_prompt = create_user_prompt(user_query, context_chunks)
-                
-                # Call LLM
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    temperature=self.temperature,
-                    max_tokens=self.max_tokens,
-                    messages=[
-                        {"role": "system", "content": SYSTEM_PROMPT},
-                        {"role": "user", "content": user_prompt}
-                    ],
-                    tools=TOOLS,
-                    tool_choice="auto"
-                )
-                
-                message = response.choices[0].message
+                # Identical question over identical context: reuse the answer
+                cache_key = self._response_cache_key(user_query, context_chunks)
+                cached = self._response_cache.get(cache_key)
                 
-                if message.tool_calls:
-                    response_text = self._handle_tool_calls(
-                        message.tool_calls,
+                if cached is not None:
+                    self._response_cache.move_to_end(cache_key)
+                    answer = cached
+                    used_tools = False
+                    tokens_used = 0
+                else:
+                    answer, used_tools, tokens_used = self._generate_response(
                         user_query,
-                        context_chunks
+                        context_chunks,
+                        on_token
                     )
-                else:
-                    response_text = message.content
                 
-                # Validate response
-                is_valid, errors, warnings = self.response_validator.validate(
-                    response_text,
+                # Validated on every call so staleness warnings stay current
+                response_text, citations, is_valid, errors, warnings = self._validate_response(
+                    answer,
                     context_chunks
                 )
                 
-                # Add warnings to response if any
-                if warnings:
-                    response_text = self.response_validator.add_warnings_to_response(
-                        response_text,
-                        warnings
-                    )
-                
-                # Extract citations
-                citations = self._extract_citations(response_text, context_chunks)
+                # Only cache answers that passed validation without tool calls
+                if cached is None and is_valid and not used_tools:
+                    self._response_cache[cache_key] = answer
+                    if len(self._response_cache) > self.response_cache_size:
+                        self._response_cache.popitem(last=False)
                 
                 # Calculate cost
-                tokens_used = response.usage.total_tokens
                 cost = self._estimate_cost(tokens_used)
                 
                 # Record metrics
                 metrics = QueryMetrics(
                     query=user_query,
-                    start_time=start_time,
-                    end_time=datetime.utcnow(),
+                    start_ns=start_ns,
+                    end_ns=time.time_ns(),
                     chunks_retrieved=len(context_chunks),
                     llm_model=self.model,
                     tokens_used=tokens_used,
                     cost_usd=cost,
-                    citations=citations
+                    citations=list(citations),
+                    cache_hit=cached is not None
                 )
                 metrics_collector.record_query(metrics)
                 
@@ -145,17 +147,18 @@ class LLMOrchestrator:
                     tokens=tokens_used,
                     cost_usd=round(cost, 4),
                     citations_count=len(citations),
-                    validation_passed=is_valid
+                    validation_passed=is_valid,
+                    cache_hit=cached is not None
                 )
                 
                 return {
                     "response": response_text,
-                    "citations": citations,
+                    "citations": list(citations),
                     "context_chunks": context_chunks,  # For debugging
                     "validation": {
                         "is_valid": is_valid,
-                        "errors": errors,
-                        "warnings": warnings
+                        "errors": list(errors),
+                        "warnings": list(warnings)
                     },
                     "metrics": metrics.to_dict()
                 }
@@ -164,6 +167,154 @@ class LLMOrchestrator:
                 logger.error("Query failed", query=user_query[:100], error=str(e))
                 raise
     
+    def _generate_response(
+        self,
+        user_query: str,
+        context_chunks: List[Dict],
+        on_token: Optional[Callable[[str], None]] = None
+    ) -> Tuple[str, bool, int]:
+        """
+        Call the LLM over the retrieved context
+        
+        Returns:
+            Tuple of (response text, whether tools were called, tokens used)
+        """
+        # Create prompt with context
+        user_prompt = create_user_prompt(user_query, context_chunks)
+        
+        # Call LLM
+        content, tool_calls, tokens_used = self._stream_completion(
+            user_prompt,
+            on_token
+        )
+        
+        if tool_calls:
+            response_text = self._handle_tool_calls(
+                tool_calls,
+                user_query,
+                context_chunks
+            )
+        else:
+            response_text = content
+        
+        return response_text, bool(tool_calls), tokens_used
+    
+    def _validate_response(
+        self,
+        response_text: str,
+        context_chunks: List[Dict]
+    ) -> Tuple[str, Tuple[str, ...], bool, Tuple[str, ...], Tuple[str, ...]]:
+        """
+        Validate an answer against its context and attach any warnings
+        
+        Returns:
+            Tuple of (response text, citations, is_valid, errors, warnings)
+        """
+        # Validate response
+        is_valid, errors, warnings = self.response_validator.validate_once(
+            response_text,
+            context_chunks
+        )
+        
+        # Add warnings to response if any
+        if warnings:
+            response_text = self.response_validator.add_warnings_to_response(
+                response_text,
+                warnings
+            )
+        
+        # Extract citations
+        citations = self._extract_citations(response_text, context_chunks)
+        
+        return (
+            response_text,
+            tuple(citations),
+            is_valid,
+            tuple(errors),
+            tuple(warnings)
+        )
+    
+    @staticmethod
+    def _response_cache_key(user_query: str, context_chunks: List[Dict]) -> bytes:
+        """Digest of the query and the exact context it would be answered from"""
+        digest = hashlib.blake2b(user_query.encode())
+        # Chunk IDs are positional, so include content to catch re-indexed files
+        for chunk in sorted(context_chunks, key=itemgetter('chunk_id')):
+            digest.update(b'\x00' + chunk['chunk_id'].encode())
+            digest.update(b'\x00' + chunk['text'].encode())
+        return digest.digest()
+    
+    def _stream_completion(
+        self,
+        user_prompt: str,
+        on_token: Optional[Callable[[str], None]] = None
+    ) -> Tuple[str, List[ChatCompletionMessageToolCall], int]:
+        """
+        Stream the LLM completion, forwarding content deltas as they arrive
+        
+        Returns:
+            Tuple of (response text, tool calls, total tokens used)
+        """
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": user_prompt}
+            ],
+            tools=TOOLS,
+            tool_choice="auto",
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        
+        content_parts = []
+        tool_call_parts = {}
+        tokens_used = 0
+        
+        for chunk in stream:
+            # The final chunk carries usage and no choices
+            if chunk.usage:
+                tokens_used = chunk.usage.total_tokens
+            if not chunk.choices:
+                continue
+            
+            delta = chunk.choices[0].delta
+            
+            if delta.content:
+                content_parts.append(delta.content)
+                if on_token:
+                    on_token(delta.content)
+            
+            # Tool calls arrive as fragments keyed by index
+            for tool_delta in delta.tool_calls or ():
+                parts = tool_call_parts.setdefault(
+                    tool_delta.index,
+                    {"id": "", "name": "", "arguments": []}
+                )
+                if tool_delta.id:
+                    parts["id"] = tool_delta.id
+                if tool_delta.function:
+                    if tool_delta.function.name:
+                        parts["name"] = tool_delta.function.name
+                    if tool_delta.function.arguments:
+                        parts["arguments"].append(tool_delta.function.arguments)
+        
+        tool_calls = [
+            ChatCompletionMessageToolCall(
+                id=parts["id"],
+                type="function",
+                function=Function(
+                    name=parts["name"],
+                    arguments="".join(parts["arguments"])
+                )
+            )
+            for _, parts in sorted(tool_call_parts.items())
+        ]
+        
+        return "".join(content_parts), tool_calls, tokens_used
+    
     def _handle_tool_calls(
         self,
         tool_calls,
@@ -203,26 +354,26 @@ class LLMOrchestrator:
     
     def _extract_citations(self, response_text: str, context_chunks: List[Dict]) -> List[str]:
         """Extract file paths mentioned in response"""
-        citations = []
+        if ahocorasick:
+            # Find every context path in one linear scan of the response
+            automaton = ahocorasick.Automaton()
+            for chunk in context_chunks:
+                file_path = chunk.get('file_path', '')
+                if file_path:
+                    automaton.add_word(file_path, file_path)
+            
+            if len(automaton) == 0:
+                return []
+            
+            automaton.make_automaton()
+            return list({file_path for _, file_path in automaton.iter(response_text)})
         
-        for chunk in context_chunks:
-            file_path = chunk.get('file_path', '')
-            if file_path and file_path in response_text:
-                citations.append(file_path)
+        # Chunks of one file share a path, so scan the response once per unique path
+        paths = {chunk.get('file_path', '') for chunk in context_chunks}
+        paths.discard('')
         
-        return list(set(citations))
+        return [file_path for file_path in paths if file_path in response_text]
     
     def _estimate_cost(self, tokens: int) -> float:
         """Estimate API cost"""
-        input_cost_per_1k = 0.0025
-        output_cost_per_1k = 0.01
-        
-        input_tokens = int(tokens * 0.6)
-        output_tokens = int(tokens * 0.4)
-        
-        cost = (
-            (input_tokens / 1000) * input_cost_per_1k +
-            (output_tokens / 1000) * output_cost_per_1k
-        )
-        
-        return cost
\ No newline at end of file
+        return tokens * _BLENDED_COST_PER_TOKEN
\ No newline at end of file
@@ -20,12 +20,21 @@ Sources:
 def create_user_prompt(query: str, context_chunks: list) -> str:
     """Create user prompt with context"""
     
-    context_text = "\n\n".join([
-        f"File: {chunk['file_path']}\n"
-        f"Last modified: {chunk.get('commit_date', 'unknown')}\n"
-        f"Content:\n{chunk['text']}"
-        for chunk in context_chunks
-    ])
+    # Append pieces to one list and join once, instead of building an
+    # intermediate string per chunk
+    parts = []
+    append = parts.append
+    for chunk in context_chunks:
+        if parts:
+            append("\n\n")
+        append("File: ")
+        append(chunk['file_path'])
+        append("\nLast modified: ")
+        append(str(chunk.get('commit_date', 'unknown')))
+        append("\nContent:\n")
+        append(chunk['text'])
+    
+    context_text = "".join(parts)
     
     return f"""CONTEXT FROM GITHUB:
 {context_text}
@@ -1,4 +1,4 @@
-from .embedder import Embedder
+from .embedder import Embedder, EmbedderBatcher
 from .retriever import HybridRetriever
 
-__all__ = ['Embedder', 'HybridRetriever']
\ No newline at end of file
+__all__ = ['Embedder', 'EmbedderBatcher', 'HybridRetriever']
\ No newline at end of file
@@ -1,10 +1,34 @@
-from typing import List, Union
+from array import array
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional, Tuple, Union
+import base64
 import openai
+import re
+import sys
+import threading
 import time
 
 from config.settings import settings
 from observability.logger import logger
 
+# Durations in OpenAI rate-limit reset headers, e.g. "20ms", "1s", "6m0s"
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+def _parse_duration(value: str) -> float:
+    """Parse a rate-limit reset duration into seconds"""
+    return sum(
+        float(amount) * _DURATION_UNITS[unit]
+        for amount, unit in _DURATION_PART.findall(value)
+    )
+
+def _decode_embedding(encoded: str) -> array:
+    """Decode a base64 float32 embedding into a compact array, never building Python floats"""
+    embedding = array("f", base64.b64decode(encoded))
+    if sys.byteorder == "big":
+        embedding.byteswap()  # The API sends little-endian floats
+    return embedding
+
 class Embedder:
     """Generate embeddings using OpenAI API"""
     
@@ -12,8 +36,10 @@ class Embedder:
         self.client = openai.OpenAI(api_key=settings.llm.api_key)
         self.model = settings.llm.embedding_model
         self.batch_size = 100  # OpenAI allows up to 2048 texts per request
+        self.max_workers = 8  # Concurrent batch requests
+        self.rate_limit_threshold = 5  # Start pacing below this many remaining requests
     
-    def embed_text(self, text: str) -> List[float]:
+    def embed_text(self, text: str) -> array:
         """
         Generate embedding for a single text
         
@@ -21,22 +47,23 @@ class Embedder:
             text: Text to embed
         
         Returns:
-            1536-dimensional embedding vector
+            1536-dimensional float32 embedding vector
         """
         try:
             response = self.client.embeddings.create(
                 model=self.model,
-                input=text
+                input=text,
+                encoding_format="base64"
             )
             
-            embedding = response.data[0].embedding
+            embedding = _decode_embedding(response.data[0].embedding)
             return embedding
             
         except Exception as e:
             logger.error("Failed to generate embedding", error=str(e))
             raise
     
-    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+    def embed_batch(self, texts: List[str]) -> List[array]:
         """
         Generate embeddings for multiple texts
         
@@ -49,38 +76,167 @@ class Embedder:
         if not texts:
             return []
         
-        embeddings = []
+        # Boilerplate (license headers, imports) repeats across chunks; embed each text once
+        unique_index = {}
+        order = [unique_index.setdefault(text, len(unique_index)) for text in texts]
+        unique_texts = list(unique_index)
         
-        # Process in batches
-        for i in range(0, len(texts), self.batch_size):
-            batch = texts[i:i + self.batch_size]
-            
-            with logger.operation("embed_batch", batch_size=len(batch)):
-                try:
-                    response = self.client.embeddings.create(
-                        model=self.model,
-                        input=batch
-                    )
-                    
-                    batch_embeddings = [item.embedding for item in response.data]
+        batches = [
+            (i, unique_texts[i:i + self.batch_size])
+            for i in range(0, len(unique_texts), self.batch_size)
+        ]
+        
+        # A single batch (e.g. micro-batched queries) needs no thread pool
+        if len(batches) == 1:
+            embeddings = self._embed_one_batch(batches[0])
+        else:
+            # Batches are network-bound, so run them concurrently; map keeps order
+            embeddings = []
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for batch_embeddings in executor.map(self._embed_one_batch, batches):
                     embeddings.extend(batch_embeddings)
-                    
-                    logger.info(
-                        "Generated embeddings",
-                        count=len(batch),
-                        total=len(embeddings)
-                    )
-                    
-                    # Rate limiting - be nice to the API
-                    if i + self.batch_size < len(texts):
-                        time.sleep(0.1)
-                    
-                except Exception as e:
-                    logger.error(
-                        "Failed to generate batch embeddings",
-                        batch_index=i,
-                        error=str(e)
-                    )
-                    raise
-        
-        return embeddings
\ No newline at end of file
+            
+            logger.info("Generated embeddings", total=len(texts), unique=len(unique_texts))
+        
+        if len(unique_texts) == len(texts):
+            return embeddings
+        
+        return [embeddings[i] for i in order]
+    
+    def _embed_one_batch(self, indexed_batch: Tuple[int, List[str]]) -> List[array]:
+        """
+        Embed one batch of texts
+        
+        Args:
+            indexed_batch: Tuple of (offset into the full text list, batch texts)
+        
+        Returns:
+            List of embedding vectors for the batch
+        """
+        batch_index, batch = indexed_batch
+        
+        with logger.operation("embed_batch", batch_size=len(batch)):
+            try:
+                raw_response = self.client.embeddings.with_raw_response.create(
+                    model=self.model,
+                    input=batch,
+                    encoding_format="base64"
+                )
+                response = raw_response.parse()
+                
+                batch_embeddings = [_decode_embedding(item.embedding) for item in response.data]
+                
+                logger.info(
+                    "Generated batch embeddings",
+                    count=len(batch),
+                    batch_index=batch_index
+                )
+                
+                # Rate limiting - only pace when the API says we are close
+                self._respect_rate_limit(raw_response.headers)
+                
+                return batch_embeddings
+                
+            except Exception as e:
+                logger.error(
+                    "Failed to generate batch embeddings",
+                    batch_index=batch_index,
+                    error=str(e)
+                )
+                raise
+    
+    def _respect_rate_limit(self, headers):
+        """Sleep only when the remaining request budget is nearly exhausted"""
+        remaining = headers.get("x-ratelimit-remaining-requests")
+        reset = headers.get("x-ratelimit-reset-requests")
+        if remaining is None or reset is None:
+            return
+        
+        try:
+            remaining = int(remaining)
+            reset_seconds = _parse_duration(reset)
+        except ValueError:
+            return
+        
+        if remaining < self.rate_limit_threshold:
+            delay = reset_seconds / max(remaining, 1)
+            logger.info("Pacing embedding requests", remaining=remaining, delay_seconds=round(delay, 3))
+            time.sleep(delay)
+
+
+class EmbedderBatcher:
+    """Coalesces concurrent single-text embedding requests into batched API calls"""
+    
+    def __init__(
+        self,
+        embedder: Embedder,
+        max_batch_size: int = 32,
+        max_wait_seconds: float = 0.005
+    ):
+        self.embedder = embedder
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self._lock = threading.Lock()
+        self._pending: List[Tuple[str, Future]] = []
+        self._timer: Optional[threading.Timer] = None
+    
+    def submit(self, text: str) -> array:
+        """
+        Embed a single text, sharing an API call with concurrent requests
+        
+        The request waits up to max_wait_seconds for other requests to join
+        its batch, or is sent immediately once the batch is full.
+        
+        Args:
+            text: Text to embed
+        
+        Returns:
+            1536-dimensional float32 embedding vector
+        """
+        future = Future()
+        batch = None
+        
+        with self._lock:
+            self._pending.append((text, future))
+            
+            if len(self._pending) >= self.max_batch_size:
+                batch = self._take_pending()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.max_wait_seconds, self._flush)
+                self._timer.daemon = True
+                self._timer.start()
+        
+        if batch:
+            self._embed(batch)
+        
+        return future.result()
+    
+    def _take_pending(self) -> List[Tuple[str, Future]]:
+        """Detach the pending batch; caller must hold the lock"""
+        batch, self._pending = self._pending, []
+        
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        
+        return batch
+    
+    def _flush(self):
+        """Send whatever is pending once the wait window closes"""
+        with self._lock:
+            batch = self._take_pending()
+        
+        if batch:
+            self._embed(batch)
+    
+    def _embed(self, batch: List[Tuple[str, Future]]):
+        """Embed a batch and resolve each request's future"""
+        try:
+            embeddings = self.embedder.embed_batch([text for text, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        
+        for (_, future), embedding in zip(batch, embeddings):
+            future.set_result(embedding)
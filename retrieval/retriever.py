@@ -1,16 +1,28 @@
-from typing import List, Dict, Optional
-from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Tuple
+import functools
+import heapq
+from operator import itemgetter
 
 from storage.db import VectorDB
-from retrieval.embedder import Embedder
+from retrieval.embedder import Embedder, EmbedderBatcher
 from observability.logger import logger
 
+RRF_K = 60  # RRF constant
+
+@functools.lru_cache(maxsize=64)
+def _rrf_weights(count: int, k: int = RRF_K) -> Tuple[float, ...]:
+    """Reciprocal rank weights 1 / (k + rank) for ranks 1..count"""
+    return tuple(1.0 / (k + rank) for rank in range(1, count + 1))
+
 class HybridRetriever:
     """Combines semantic and keyword search for better results"""
     
     def __init__(self):
         self.db = VectorDB()
         self.embedder = Embedder()
+        self.batcher = EmbedderBatcher(self.embedder)
+        self.executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="retrieve")
     
     def retrieve(
         self,
@@ -35,8 +47,17 @@ class HybridRetriever:
         """
         with logger.operation("hybrid_retrieve", query=query[:100], top_k=top_k):
             
-            # Generate query embedding
-            query_embedding = self.embedder.embed_text(query)
+            # Keyword search does not need the embedding, so run it while the
+            # query is embedded and the semantic search runs
+            keyword_future = self.executor.submit(
+                self.db.keyword_search,
+                query=query,
+                limit=top_k,
+                repo_name=repo_name
+            )
+            
+            # Generate query embedding, batched with concurrent queries
+            query_embedding = self.batcher.submit(query)
             
             # Semantic search
             semantic_results = self.db.semantic_search(
@@ -49,12 +70,7 @@ class HybridRetriever:
             
             logger.info("Semantic search complete", results=len(semantic_results))
             
-            # Keyword search
-            keyword_results = self.db.keyword_search(
-                query=query,
-                limit=top_k,
-                repo_name=repo_name
-            )
+            keyword_results = keyword_future.result()
             
             logger.info("Keyword search complete", results=len(keyword_results))
             
@@ -83,37 +99,29 @@ class HybridRetriever:
         Uses reciprocal rank fusion (RRF) for combining rankings
         """
         keyword_weight = 1.0 - semantic_weight
-        k = 60  # RRF constant
-        
-        # Build chunk_id -> document map
-        all_docs = {}
-        for doc in semantic_results:
-            all_docs[doc['chunk_id']] = doc
-        for doc in keyword_results:
-            if doc['chunk_id'] not in all_docs:
-                all_docs[doc['chunk_id']] = doc
-        
-        # Calculate RRF scores
-        scores = defaultdict(float)
-        
-        # Add semantic scores
-        for rank, doc in enumerate(semantic_results, 1):
-            chunk_id = doc['chunk_id']
-            scores[chunk_id] += semantic_weight * (1.0 / (k + rank))
         
-        # Add keyword scores
-        for rank, doc in enumerate(keyword_results, 1):
-            chunk_id = doc['chunk_id']
-            scores[chunk_id] += keyword_weight * (1.0 / (k + rank))
+        # Score and remember each document in a single pass per result list;
+        # entries are [score, doc] so the doc needs no second lookup
+        entries = {}
+        for ranked_docs, weight in (
+            (semantic_results, semantic_weight),
+            (keyword_results, keyword_weight)
+        ):
+            for doc, rrf_weight in zip(ranked_docs, _rrf_weights(len(ranked_docs))):
+                score = weight * rrf_weight
+                entry = entries.get(doc['chunk_id'])
+                if entry is None:
+                    entries[doc['chunk_id']] = [score, doc]
+                else:
+                    entry[0] += score
         
-        # Sort by combined score
-        ranked_ids = sorted(scores.keys(), key=lambda x: scores[x], reverse=True)
+        # Select the top_k entries without sorting every candidate
+        ranked = heapq.nlargest(top_k, entries.values(), key=itemgetter(0))
         
-        # Build final results
+        # Docs are fresh rows from this query, so annotate them in place
         results = []
-        for chunk_id in ranked_ids[:top_k]:
-            doc = all_docs[chunk_id].copy()
-            doc['combined_score'] = scores[chunk_id]
+        for score, doc in ranked:
+            doc['combined_score'] = score
             results.append(doc)
         
         return results
@@ -1,11 +1,294 @@
+import asyncio
+import hashlib
+import io
+import struct
 import psycopg2
 from psycopg2.extras import execute_values
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
-from typing import List, Dict, Optional
-from datetime import datetime
+from psycopg2.pool import ThreadedConnectionPool
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import List, Dict, Optional, Sequence, Tuple
+import threading
+import time
+import weakref
 
 from config.settings import settings
 from observability.logger import logger
+from storage import memory_index
+
+@lru_cache(maxsize=None)
+def _vector_template(dimensions: int) -> str:
+    """pgvector literal template; %.9g round-trips float32 values exactly"""
+    return '[' + ','.join(['%.9g'] * dimensions) + ']'
+
+def _vector_literal(embedding: Sequence[float]) -> str:
+    """Format an embedding (list or float32 array) as a pgvector text literal"""
+    # One C-level format call instead of a str() per component
+    return _vector_template(len(embedding)) % tuple(embedding)
+
+# Columns written by upsert_chunks, and how an existing chunk is refreshed;
+# last_indexed and metadata are left to their column defaults on insert
+_UPSERT_COLUMNS = (
+    "chunk_id, repo_name, file_path, file_type, text, embedding, "
+    "commit_hash, commit_date, author, github_url"
+)
+_UPSERT_CONFLICT = """
+    ON CONFLICT (repo_name, chunk_id) DO UPDATE SET
+        text = EXCLUDED.text,
+        embedding = EXCLUDED.embedding,
+        commit_hash = EXCLUDED.commit_hash,
+        commit_date = EXCLUDED.commit_date,
+        author = EXCLUDED.author,
+        last_indexed = DEFAULT
+"""
+
+# Below this many rows a multi-row INSERT beats COPY's staging-table setup
+_COPY_MIN_ROWS = 100
+
+# Staging table for binary COPY. commit_date arrives as text and is cast on
+# merge, as the parameterized INSERT path casts the same string
+_STAGE_TABLE_SQL = """
+    CREATE TEMP TABLE documents_stage (
+        chunk_id TEXT,
+        repo_name TEXT,
+        file_path TEXT,
+        file_type TEXT,
+        text TEXT,
+        embedding halfvec(1536),
+        commit_hash TEXT,
+        commit_date TEXT,
+        author TEXT,
+        github_url TEXT
+    ) ON COMMIT DROP
+"""
+
+# COPY BINARY framing: signature, flags and header extension length; per
+# tuple a field count; then the end-of-data marker
+_COPY_BINARY_HEADER = b'PGCOPY\n\xff\r\n\x00' + struct.pack('>ii', 0, 0)
+_COPY_BINARY_TUPLE = struct.pack('>h', 10)
+_COPY_BINARY_TRAILER = struct.pack('>h', -1)
+_COPY_NULL = struct.pack('>i', -1)
+_FIELD_LENGTH = struct.Struct('>i')
+
+@lru_cache(maxsize=None)
+def _halfvec_struct(dimensions: int) -> struct.Struct:
+    """Binary halfvec layout: dimensions, unused, then big-endian float16 values"""
+    return struct.Struct(f'>hh{dimensions}e')
+
+def _write_copy_text(buffer: io.BytesIO, value):
+    """Write one text field in COPY BINARY format"""
+    if value is None:
+        buffer.write(_COPY_NULL)
+        return
+    data = str(value).encode('utf-8')
+    buffer.write(_FIELD_LENGTH.pack(len(data)))
+    buffer.write(data)
+
+# Partitioned by repository so a repository can be dropped as a whole
+_DOCUMENTS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS documents (
+        id SERIAL,
+        chunk_id TEXT NOT NULL,
+        repo_name TEXT NOT NULL,
+        file_path TEXT NOT NULL,
+        file_type TEXT,
+        text TEXT NOT NULL,
+        embedding halfvec(1536),
+        commit_hash TEXT,
+        commit_date TIMESTAMP,
+        author TEXT,
+        github_url TEXT,
+        last_indexed TIMESTAMP DEFAULT (NOW() AT TIME ZONE 'UTC'),
+        metadata JSONB,
+        created_at TIMESTAMP DEFAULT NOW(),
+        text_tsv tsvector GENERATED ALWAYS AS (to_tsvector('english', text)) STORED,
+        PRIMARY KEY (repo_name, chunk_id)
+    ) PARTITION BY LIST (repo_name);
+"""
+
+# Every index name an unpartitioned documents table may carry
+_LEGACY_INDEXES = (
+    "idx_documents_repo",
+    "idx_documents_file_path",
+    "idx_documents_file_type",
+    "idx_documents_repo_filetype",
+    "idx_documents_embedding_hnsw",
+    "idx_documents_text_fts",
+    "idx_documents_text_tsv",
+    "idx_documents_last_indexed"
+)
+
+def _partition_name(repo_name: str) -> str:
+    """Name of the documents partition holding one repository"""
+    return "documents_" + hashlib.md5(repo_name.encode()).hexdigest()[:16]
+
+# Needs the unique index on documents_stats; readers are not blocked
+_REFRESH_STATS_SQL = "REFRESH MATERIALIZED VIEW CONCURRENTLY documents_stats"
+
+# Columns returned by the search queries, in result-row order
+_SEARCH_COLUMNS = (
+    "chunk_id, repo_name, file_path, file_type, text, "
+    "commit_hash, commit_date, author, github_url"
+)
+
+def _search_results(cur, score_key: str) -> List[Dict]:
+    """Build result dicts from executed search rows (_SEARCH_COLUMNS plus a score)"""
+    return [
+        {
+            'chunk_id': chunk_id,
+            'repo_name': repo_name,
+            'file_path': file_path,
+            'file_type': file_type,
+            'text': text,
+            'commit_hash': commit_hash,
+            'commit_date': commit_date.isoformat() if commit_date else None,
+            'author': author,
+            'github_url': github_url,
+            score_key: float(score)
+        }
+        for (
+            chunk_id, repo_name, file_path, file_type, text,
+            commit_hash, commit_date, author, github_url, score
+        ) in cur
+    ]
+
+# Names of the statements already prepared on each pooled connection
+_prepared_statements = weakref.WeakKeyDictionary()
+
+# Filtered statements whose plan has been checked for a sequential scan
+_checked_plans = set()
+
+def _prepared_statement(name: str, param_types: List[str], body: str) -> Tuple[str, str, str]:
+    """Build the (name, PREPARE sql, EXECUTE sql) triple for a statement"""
+    placeholders = ", ".join(["%s"] * len(param_types))
+    return (
+        name,
+        f"PREPARE {name} ({', '.join(param_types)}) AS {body}",
+        f"EXECUTE {name} ({placeholders})"
+    )
+
+@lru_cache(maxsize=None)
+def _semantic_search_statement(filter_repo: bool, filter_file_type: bool) -> Tuple[str, str, str]:
+    """Semantic search statement for one combination of optional filters"""
+    param_types = ["halfvec"]
+    where_clauses = []
+    
+    if filter_repo:
+        param_types.append("text")
+        where_clauses.append(f"repo_name = ${len(param_types)}")
+    
+    if filter_file_type:
+        param_types.append("text")
+        where_clauses.append(f"file_type = ${len(param_types)}")
+    
+    param_types += ["integer", "float8"]  # limit, max cosine distance
+    where_sql = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
+    
+    # Each distance is computed once; the inner ORDER BY drives the HNSW
+    # scan, and thresholding after LIMIT keeps the same rows. Only keys and
+    # scores are returned; text is fetched separately for the final rows.
+    return _prepared_statement(
+        f"semantic_search_{int(filter_repo)}{int(filter_file_type)}",
+        param_types,
+        f"""
+            SELECT repo_name, chunk_id, distance
+            FROM (
+                SELECT repo_name, chunk_id, embedding <=> $1 as distance
+                FROM documents
+                {where_sql}
+                ORDER BY distance
+                LIMIT ${len(param_types) - 1}
+            ) nearest
+            WHERE distance <= ${len(param_types)}
+            ORDER BY distance
+        """
+    )
+
+@lru_cache(maxsize=None)
+def _keyword_search_statement(filter_repo: bool) -> Tuple[str, str, str]:
+    """Keyword search statement with or without the repository filter"""
+    param_types = ["text"]
+    where_clauses = ["text_tsv @@ query"]
+    
+    if filter_repo:
+        param_types.append("text")
+        where_clauses.append(f"repo_name = ${len(param_types)}")
+    
+    param_types.append("integer")  # limit
+    where_sql = " AND ".join(where_clauses)
+    
+    return _prepared_statement(
+        f"keyword_search_{int(filter_repo)}",
+        param_types,
+        f"""
+            SELECT {_SEARCH_COLUMNS}, ts_rank(text_tsv, query) as rank
+            FROM documents, plainto_tsquery('english', $1) query
+            WHERE {where_sql}
+            ORDER BY rank DESC
+            LIMIT ${len(param_types)}
+        """
+    )
+
+class _BlockingConnectionPool(ThreadedConnectionPool):
+    """ThreadedConnectionPool that waits for a free connection instead of raising PoolError"""
+    
+    def __init__(self, minconn: int, maxconn: int, *args, **kwargs):
+        self._slots = threading.BoundedSemaphore(maxconn)
+        super().__init__(minconn, maxconn, *args, **kwargs)
+    
+    def getconn(self, key=None):
+        self._slots.acquire()
+        try:
+            return super().getconn(key)
+        except Exception:
+            self._slots.release()
+            raise
+    
+    def putconn(self, conn=None, key=None, close=False):
+        try:
+            super().putconn(conn, key, close)
+        finally:
+            self._slots.release()
+
+@lru_cache(maxsize=None)
+def _get_pool(db_url: str) -> ThreadedConnectionPool:
+    """Process-wide connection pool per database URL; borrowers wait when it is exhausted"""
+    return _BlockingConnectionPool(
+        minconn=2,
+        maxconn=settings.database.pool_size,
+        dsn=db_url
+    )
+
+# Seconds between checks for writes by other processes to the memory index's data
+_MEMORY_INDEX_CHECK_INTERVAL = 5.0
+
+class _MemoryIndexState:
+    """Process-wide in-memory index for one database, reloaded after writes"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.index: Optional[memory_index.MemoryVectorIndex] = None
+        self.version = None  # Write counters of the documents partitions at load time
+        self.checked_at = 0.0
+    
+    def invalidate(self):
+        """Drop the loaded index; the next search reloads it"""
+        with self.lock:
+            self.index = None
+
+@lru_cache(maxsize=None)
+def _get_memory_index_state(db_url: str) -> _MemoryIndexState:
+    """Memory index shared by every VectorDB on a database, like the pool"""
+    return _MemoryIndexState()
+
+# Cumulative writes to the documents partitions; changes whenever any process
+# writes, or a partition is dropped
+_DOCUMENTS_VERSION_SQL = """
+    SELECT COUNT(*), COALESCE(SUM(n_tup_ins + n_tup_upd + n_tup_del), 0)
+    FROM pg_stat_user_tables
+    WHERE relid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = 'documents'::regclass)
+"""
 
 class VectorDB:
     """PostgreSQL + pgvector database operations"""
@@ -13,12 +296,39 @@ class VectorDB:
     def __init__(self):
         self.db_url = settings.database.url
         self._ensure_schema()
+        self._pool = _get_pool(self.db_url)
+        self._memory_index_state = _get_memory_index_state(self.db_url)
     
     def _get_connection(self):
-        """Get database connection"""
+        """Get a dedicated (unpooled) database connection"""
         conn = psycopg2.connect(self.db_url)
         return conn
     
+    @contextmanager
+    def _conn(self):
+        """Borrow a pooled connection; any open transaction is rolled back on return"""
+        conn = self._pool.getconn()
+        broken = False
+        try:
+            yield conn
+        finally:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                broken = True
+            self._pool.putconn(conn, close=broken or bool(conn.closed))
+    
+    def _execute_prepared(self, conn, cur, statement: Tuple[str, str, str], params: List):
+        """Execute a server-side prepared statement, preparing it on first use per connection"""
+        name, prepare_sql, execute_sql = statement
+        prepared = _prepared_statements.setdefault(conn, set())
+        
+        if name not in prepared:
+            cur.execute(prepare_sql)
+            prepared.add(name)
+        
+        cur.execute(execute_sql, params)
+    
     def _ensure_schema(self):
         """Create tables and indexes if they don't exist"""
         with logger.operation("ensure_schema"):
@@ -30,52 +340,94 @@ class VectorDB:
                 # Enable pgvector extension
                 cur.execute("CREATE EXTENSION IF NOT EXISTS vector;")
                 
-                # Create documents table
+                # Iterative index scans for filtered searches need pgvector 0.8+
+                cur.execute("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+                version = tuple(int(part) for part in cur.fetchone()[0].split('.')[:2])
+                self._iterative_scan = version >= (0, 8)
+                if not self._iterative_scan:
+                    logger.warning(
+                        "pgvector %s lacks iterative index scans; filtered searches may return fewer results",
+                        '.'.join(map(str, version))
+                    )
+                
+                # Tables from before partitioning are rebuilt once
+                cur.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass('documents')")
+                row = cur.fetchone()
+                if row and row[0] == 'r':
+                    self._migrate_to_partitions(cur)
+                
+                # Create documents table, one partition per repository
+                cur.execute(_DOCUMENTS_TABLE_SQL)
                 cur.execute("""
-                    CREATE TABLE IF NOT EXISTS documents (
-                        id SERIAL PRIMARY KEY,
-                        chunk_id TEXT UNIQUE NOT NULL,
-                        repo_name TEXT NOT NULL,
-                        file_path TEXT NOT NULL,
-                        file_type TEXT,
-                        text TEXT NOT NULL,
-                        embedding vector(1536),
-                        commit_hash TEXT,
-                        commit_date TIMESTAMP,
-                        author TEXT,
-                        github_url TEXT,
-                        last_indexed TIMESTAMP DEFAULT NOW(),
-                        metadata JSONB,
-                        created_at TIMESTAMP DEFAULT NOW()
-                    );
+                    CREATE TABLE IF NOT EXISTS documents_default
+                    PARTITION OF documents DEFAULT;
                 """)
                 
-                # Create indexes for fast retrieval
+                self._ensure_text_compression(conn, cur)
+                
+                # Create indexes for fast retrieval. Searches filter on repo_name
+                # and optionally file_type, and repo-level lookups use the prefix;
+                # nothing filters on file_path, so it is not indexed
                 cur.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_documents_repo 
-                    ON documents(repo_name);
+                    CREATE INDEX IF NOT EXISTS idx_documents_repo_filetype 
+                    ON documents(repo_name, file_type);
                 """)
                 
+                # Give the graph build enough memory to stay in RAM
+                cur.execute(
+                    "SET maintenance_work_mem = %s",
+                    (settings.database.index_build_memory,)
+                )
+                cur.execute("SET max_parallel_maintenance_workers = 7")
+                
+                # Vector similarity index (HNSW for fast approximate search)
+                cur.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_documents_embedding_hnsw 
+                    ON documents USING hnsw (embedding halfvec_cosine_ops)
+                    WITH (m = %s, ef_construction = %s);
+                """, (settings.database.hnsw_m, settings.database.hnsw_ef_construction))
+                
+                # Lets MAX(last_indexed) read one index entry
                 cur.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_documents_file_path 
-                    ON documents(file_path);
+                    CREATE INDEX IF NOT EXISTS idx_documents_last_indexed 
+                    ON documents(last_indexed);
                 """)
                 
+                # Per-repo file counts for get_stats, refreshed after indexing
+                # instead of aggregated on every read. Keyed by repo_name so it
+                # can be refreshed concurrently; the single-row version is replaced.
                 cur.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_documents_file_type 
-                    ON documents(file_type);
+                    SELECT NOT EXISTS (
+                        SELECT 1 FROM pg_attribute
+                        WHERE attrelid = to_regclass('documents_stats') AND attname = 'repo_name'
+                    )
+                """)
+                if cur.fetchone()[0]:
+                    cur.execute("DROP MATERIALIZED VIEW IF EXISTS documents_stats;")
+                cur.execute("""
+                    CREATE MATERIALIZED VIEW IF NOT EXISTS documents_stats AS
+                    SELECT repo_name, COUNT(DISTINCT file_path) as total_files
+                    FROM documents
+                    GROUP BY repo_name;
+                """)
+                cur.execute("""
+                    CREATE UNIQUE INDEX IF NOT EXISTS idx_documents_stats_repo
+                    ON documents_stats(repo_name);
                 """)
                 
-                # Vector similarity index (HNSW for fast approximate search)
+                # Full-text search index on the stored tsvector
                 cur.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_documents_embedding_hnsw 
-                    ON documents USING hnsw (embedding vector_cosine_ops);
+                    CREATE INDEX IF NOT EXISTS idx_documents_text_tsv 
+                    ON documents USING gin(text_tsv);
                 """)
                 
-                # Full-text search index
+                # Last commit each repository was fully indexed at
                 cur.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_documents_text_fts 
-                    ON documents USING gin(to_tsvector('english', text));
+                    CREATE TABLE IF NOT EXISTS repo_index_state (
+                        repo_name TEXT PRIMARY KEY,
+                        commit_hash TEXT NOT NULL,
+                        indexed_at TIMESTAMP DEFAULT (NOW() AT TIME ZONE 'UTC')
+                    );
                 """)
                 
                 logger.info("Database schema initialized")
@@ -87,6 +439,73 @@ class VectorDB:
                 cur.close()
                 conn.close()
     
+    def _ensure_text_compression(self, conn, cur):
+        """Switch chunk text to LZ4 TOAST compression once, where the server supports it"""
+        # LZ4 decompresses much faster than pglz; needs PG14+ built --with-lz4
+        if conn.server_version < 140000:
+            logger.warning("LZ4 compression needs PostgreSQL 14+, keeping pglz")
+            return
+        
+        cur.execute("""
+            SELECT attcompression FROM pg_attribute
+            WHERE attrelid = 'documents'::regclass AND attname = 'text'
+        """)
+        if cur.fetchone()[0] == 'l':
+            return
+        
+        # Applies to newly written rows and recurses to partitions
+        try:
+            cur.execute("ALTER TABLE documents ALTER COLUMN text SET COMPRESSION lz4")
+        except psycopg2.Error as e:
+            logger.warning("LZ4 compression unavailable, keeping pglz", error=str(e).strip())
+    
+    def _migrate_to_partitions(self, cur):
+        """Rebuild an unpartitioned documents table as a partitioned one"""
+        logger.info("Migrating documents to per-repository partitions")
+        
+        cur.execute("BEGIN")
+        try:
+            # Free the object names the new table and its indexes use
+            cur.execute("DROP MATERIALIZED VIEW IF EXISTS documents_stats;")
+            cur.execute("ALTER TABLE documents RENAME TO documents_unpartitioned;")
+            cur.execute(f"DROP INDEX IF EXISTS {', '.join(_LEGACY_INDEXES)};")
+            cur.execute("ALTER INDEX IF EXISTS documents_pkey RENAME TO documents_unpartitioned_pkey;")
+            
+            cur.execute(_DOCUMENTS_TABLE_SQL)
+            cur.execute("CREATE TABLE documents_default PARTITION OF documents DEFAULT;")
+            
+            cur.execute("SELECT DISTINCT repo_name FROM documents_unpartitioned")
+            for (repo_name,) in cur.fetchall():
+                self._ensure_repo_partition(cur, repo_name)
+            
+            # Older tables may still hold full-precision vectors
+            cur.execute("""
+                INSERT INTO documents (
+                    chunk_id, repo_name, file_path, file_type, text, embedding,
+                    commit_hash, commit_date, author, github_url,
+                    last_indexed, metadata, created_at
+                )
+                SELECT
+                    chunk_id, repo_name, file_path, file_type, text, embedding::halfvec(1536),
+                    commit_hash, commit_date, author, github_url,
+                    last_indexed, metadata, created_at
+                FROM documents_unpartitioned;
+            """)
+            cur.execute("DROP TABLE documents_unpartitioned;")
+            cur.execute("COMMIT")
+            
+        except Exception:
+            cur.execute("ROLLBACK")
+            raise
+    
+    def _ensure_repo_partition(self, cur, repo_name: str):
+        """Create the partition holding a repository's chunks if it does not exist"""
+        cur.execute(
+            f"CREATE TABLE IF NOT EXISTS {_partition_name(repo_name)} "
+            "PARTITION OF documents FOR VALUES IN (%s)",
+            (repo_name,)
+        )
+    
     def upsert_chunks(self, chunks: List[Dict]) -> int:
         """
         Insert or update document chunks
@@ -102,63 +521,99 @@ class VectorDB:
             return 0
         
         with logger.operation("upsert_chunks", count=len(chunks)):
-            conn = self._get_connection()
-            cur = conn.cursor()
+            with self._conn() as conn, conn.cursor() as cur:
+                try:
+                    for repo_name in {chunk['repo_name'] for chunk in chunks}:
+                        self._ensure_repo_partition(cur, repo_name)
+                    
+                    if len(chunks) >= _COPY_MIN_ROWS:
+                        self._copy_upsert(cur, chunks)
+                    else:
+                        # Prepare data for insertion
+                        values = [
+                            (
+                                chunk['chunk_id'],
+                                chunk['repo_name'],
+                                chunk['file_path'],
+                                chunk.get('file_type', 'unknown'),
+                                chunk['text'],
+                                _vector_literal(chunk['embedding']),
+                                chunk.get('commit_hash'),
+                                chunk.get('commit_date'),
+                                chunk.get('author'),
+                                chunk.get('github_url')
+                            )
+                            for chunk in chunks
+                        ]
+                        
+                        # Use ON CONFLICT to update existing chunks
+                        execute_values(
+                            cur,
+                            f"""
+                            INSERT INTO documents ({_UPSERT_COLUMNS})
+                            VALUES %s
+                            {_UPSERT_CONFLICT}
+                            """,
+                            values,
+                            page_size=len(values)  # Bounded by _COPY_MIN_ROWS; one round trip
+                        )
+                    
+                    conn.commit()
+                    self._memory_index_state.invalidate()
+                    
+                    logger.info("Chunks upserted", count=len(chunks))
+                    return len(chunks)
+                    
+                except Exception as e:
+                    conn.rollback()
+                    logger.error("Failed to upsert chunks", error=str(e))
+                    raise
+    
+    def _copy_upsert(self, cur, chunks: List[Dict]):
+        """Stream chunks into a staging table with binary COPY, then merge them into documents"""
+        cur.execute(_STAGE_TABLE_SQL)
+        
+        # Embeddings go over the wire as packed float16, not text
+        buffer = io.BytesIO()
+        buffer.write(_COPY_BINARY_HEADER)
+        
+        for chunk in chunks:
+            buffer.write(_COPY_BINARY_TUPLE)
+            _write_copy_text(buffer, chunk['chunk_id'])
+            _write_copy_text(buffer, chunk['repo_name'])
+            _write_copy_text(buffer, chunk['file_path'])
+            _write_copy_text(buffer, chunk.get('file_type', 'unknown'))
+            _write_copy_text(buffer, chunk['text'])
             
-            try:
-                # Prepare data for insertion
-                values = [
-                    (
-                        chunk['chunk_id'],
-                        chunk['repo_name'],
-                        chunk['file_path'],
-                        chunk.get('file_type', 'unknown'),
-                        chunk['text'],
-                        chunk['embedding'],
-                        chunk.get('commit_hash'),
-                        chunk.get('commit_date'),
-                        chunk.get('author'),
-                        chunk.get('github_url'),
-                        datetime.utcnow(),
-                        None  # metadata (can be extended)
-                    )
-                    for chunk in chunks
-                ]
-                
-                # Use ON CONFLICT to update existing chunks
-                execute_values(
-                    cur,
-                    """
-                    INSERT INTO documents 
-                    (chunk_id, repo_name, file_path, file_type, text, embedding, 
-                     commit_hash, commit_date, author, github_url, last_indexed, metadata)
-                    VALUES %s
-                    ON CONFLICT (chunk_id) DO UPDATE SET
-                        text = EXCLUDED.text,
-                        embedding = EXCLUDED.embedding,
-                        commit_hash = EXCLUDED.commit_hash,
-                        commit_date = EXCLUDED.commit_date,
-                        author = EXCLUDED.author,
-                        last_indexed = EXCLUDED.last_indexed
-                    """,
-                    values
-                )
-                
-                conn.commit()
-                logger.info("Chunks upserted", count=len(chunks))
-                return len(chunks)
-                
-            except Exception as e:
-                conn.rollback()
-                logger.error("Failed to upsert chunks", error=str(e))
-                raise
-            finally:
-                cur.close()
-                conn.close()
+            embedding = chunk['embedding']
+            halfvec = _halfvec_struct(len(embedding)).pack(len(embedding), 0, *embedding)
+            buffer.write(_FIELD_LENGTH.pack(len(halfvec)))
+            buffer.write(halfvec)
+            
+            _write_copy_text(buffer, chunk.get('commit_hash'))
+            _write_copy_text(buffer, chunk.get('commit_date'))
+            _write_copy_text(buffer, chunk.get('author'))
+            _write_copy_text(buffer, chunk.get('github_url'))
+        
+        buffer.write(_COPY_BINARY_TRAILER)
+        buffer.seek(0)
+        
+        cur.copy_expert(
+            f"COPY documents_stage ({_UPSERT_COLUMNS}) FROM STDIN WITH (FORMAT binary)",
+            buffer
+        )
+        cur.execute(f"""
+            INSERT INTO documents ({_UPSERT_COLUMNS})
+            SELECT
+                chunk_id, repo_name, file_path, file_type, text, embedding,
+                commit_hash, commit_date::timestamp, author, github_url
+            FROM documents_stage
+            {_UPSERT_CONFLICT}
+        """)
     
     def semantic_search(
         self,
-        query_embedding: List[float],
+        query_embedding: Sequence[float],
         limit: int = 10,
         repo_name: Optional[str] = None,
         file_type: Optional[str] = None,
@@ -177,68 +632,164 @@ class VectorDB:
         Returns:
             List of matching documents with similarity scores
         """
-        conn = self._get_connection()
-        cur = conn.cursor()
+        return self._fetch_matches(self.semantic_matches(
+            query_embedding,
+            limit,
+            repo_name=repo_name,
+            file_type=file_type,
+            similarity_threshold=similarity_threshold
+        ))
+    
+    def semantic_matches(
+        self,
+        query_embedding: Sequence[float],
+        limit: int = 10,
+        repo_name: Optional[str] = None,
+        file_type: Optional[str] = None,
+        similarity_threshold: float = 0.7
+    ) -> List[Tuple[str, str, float]]:
+        """
+        Score chunks by vector similarity without fetching their content
         
-        try:
-            # Convert embedding list to string format for pgvector
-            embedding_str = '[' + ','.join(map(str, query_embedding)) + ']'
+        Args:
+            Same as semantic_search
+        
+        Returns:
+            List of (repo_name, chunk_id, cosine distance), nearest first
+        """
+        if settings.database.memory_index and memory_index.Index is not None:
+            matches = self._get_memory_index().search(
+                query_embedding,
+                limit,
+                1 - similarity_threshold,
+                repo_name=repo_name,
+                file_type=file_type
+            )
+            if matches is not None:
+                return matches
+        
+        filtered = bool(repo_name or file_type)
+        ef_search = settings.database.hnsw_ef_search
+        
+        with self._conn() as conn, conn.cursor() as cur:
+            # Scoped to this transaction; the pool rolls it back on return
+            if filtered:
+                # A wider candidate list leaves more rows after the filters
+                ef_search = min(ef_search + 4 * limit, settings.database.hnsw_ef_search_max)
+            
+            if filtered and self._iterative_scan:
+                # Keep scanning the graph until enough rows pass the filters
+                # instead of returning short or falling back to a seq scan
+                cur.execute(
+                    "SET LOCAL hnsw.iterative_scan = relaxed_order;"
+                    "SET LOCAL hnsw.max_scan_tuples = %s",
+                    (settings.database.hnsw_max_scan_tuples,)
+                )
             
-            # Build WHERE clause with optional filters
-            where_clauses = ["1 - (embedding <=> %s::vector) >= %s"]
-            params = [embedding_str, similarity_threshold]
+            # ef_search below the limit would cap the number of results
+            cur.execute("SET LOCAL hnsw.ef_search = %s", (max(ef_search, limit),))
+            
+            # Convert embedding list to string format for pgvector
+            params = [_vector_literal(query_embedding)]
             
             if repo_name:
-                where_clauses.append("repo_name = %s")
                 params.append(repo_name)
             
             if file_type:
-                where_clauses.append("file_type = %s")
                 params.append(file_type)
             
-            where_sql = " AND ".join(where_clauses)
+            # Add limit and the threshold as a maximum cosine distance
+            params += [limit, 1 - similarity_threshold]
             
-            # Add embedding_str and limit to params
-            query_params = [embedding_str] + params + [embedding_str, limit]
+            statement = _semantic_search_statement(bool(repo_name), bool(file_type))
+            self._execute_prepared(conn, cur, statement, params)
+            matches = cur.fetchall()
             
-            cur.execute(f"""
-                SELECT 
-                    chunk_id,
-                    repo_name,
-                    file_path,
-                    file_type,
-                    text,
-                    commit_hash,
-                    commit_date,
-                    author,
-                    github_url,
-                    1 - (embedding <=> %s::vector) as similarity
-                FROM documents
-                WHERE {where_sql}
-                ORDER BY embedding <=> %s::vector
-                LIMIT %s
-            """, query_params)
+            if filtered and statement[0] not in _checked_plans:
+                _checked_plans.add(statement[0])
+                self._check_plan(cur, statement, params)
+            
+            return matches
+    
+    def _check_plan(self, cur, statement: Tuple[str, str, str], params: List):
+        """Log a prepared statement's plan, warning if it skips the HNSW index"""
+        name, _, execute_sql = statement
+        cur.execute("EXPLAIN " + execute_sql, params)
+        plan = "\n".join(row[0] for row in cur.fetchall())
+        
+        if "Seq Scan" in plan:
+            logger.warning("Search plan uses a sequential scan", statement=name, plan=plan)
+        else:
+            logger.info("Search plan", statement=name, plan=plan)
+    
+    def _get_memory_index(self) -> memory_index.MemoryVectorIndex:
+        """
+        Get the process-wide memory index, (re)loading it when stale
+        
+        Writes through any VectorDB in this process invalidate it directly;
+        writes by other processes are picked up by a throttled check of the
+        documents partitions' write counters.
+        """
+        state = self._memory_index_state
+        
+        with state.lock:
+            now = time.monotonic()
+            if state.index is not None and now - state.checked_at < _MEMORY_INDEX_CHECK_INTERVAL:
+                return state.index
             
-            results = []
-            for row in cur.fetchall():
-                results.append({
-                    'chunk_id': row[0],
-                    'repo_name': row[1],
-                    'file_path': row[2],
-                    'file_type': row[3],
-                    'text': row[4],
-                    'commit_hash': row[5],
-                    'commit_date': row[6].isoformat() if row[6] else None,
-                    'author': row[7],
-                    'github_url': row[8],
-                    'similarity': float(row[9])
-                })
+            with self._conn() as conn, conn.cursor() as cur:
+                cur.execute(_DOCUMENTS_VERSION_SQL)
+                version = cur.fetchone()
+            state.checked_at = now
             
-            return results
+            if state.index is None or version != state.version:
+                state.index = self._load_memory_index()
+                state.version = version
             
-        finally:
-            cur.close()
-            conn.close()
+            return state.index
+    
+    def _load_memory_index(self) -> memory_index.MemoryVectorIndex:
+        """Load every stored embedding into a new in-process index"""
+        with logger.operation("load_memory_index"):
+            index = memory_index.MemoryVectorIndex()
+            
+            # Stream with a server-side cursor rather than materializing the table
+            with self._conn() as conn, conn.cursor(name="load_memory_index") as cur:
+                cur.itersize = 10_000
+                cur.execute("SELECT chunk_id, repo_name, file_type, embedding::text FROM documents")
+                
+                while True:
+                    rows = cur.fetchmany(cur.itersize)
+                    if not rows:
+                        break
+                    index.add(
+                        (chunk_id, repo_name, file_type, memory_index.parse_vector(embedding))
+                        for chunk_id, repo_name, file_type, embedding in rows
+                    )
+            
+            logger.info("Memory index loaded", chunks=len(index))
+        
+        return index
+    
+    def _fetch_matches(self, matches: List[Tuple[str, str, float]]) -> List[Dict]:
+        """Fetch the documents for semantic matches, nearest first"""
+        if not matches:
+            return []
+        
+        repo_names, chunk_ids, distances = zip(*matches)
+        
+        # Joining on the full key prunes partitions and uses the primary key
+        with self._conn() as conn, conn.cursor() as cur:
+            cur.execute(f"""
+                SELECT {_SEARCH_COLUMNS}, 1 - matches.distance as similarity
+                FROM documents
+                JOIN unnest(%s::text[], %s::text[], %s::float8[])
+                    AS matches(repo_name, chunk_id, distance)
+                USING (repo_name, chunk_id)
+                ORDER BY matches.distance
+            """, (list(repo_names), list(chunk_ids), list(distances)))
+            
+            return _search_results(cur, 'similarity')
     
     def keyword_search(
         self,
@@ -257,102 +808,215 @@ class VectorDB:
         Returns:
             List of matching documents with relevance scores
         """
-        conn = self._get_connection()
-        cur = conn.cursor()
-        
-        try:
-            where_clauses = ["to_tsvector('english', text) @@ plainto_tsquery('english', %s)"]
+        with self._conn() as conn, conn.cursor() as cur:
             params = [query]
             
             if repo_name:
-                where_clauses.append("repo_name = %s")
                 params.append(repo_name)
             
-            where_sql = " AND ".join(where_clauses)
             params.append(limit)
             
-            cur.execute(f"""
-                SELECT 
-                    chunk_id,
-                    repo_name,
-                    file_path,
-                    file_type,
-                    text,
-                    commit_hash,
-                    commit_date,
-                    author,
-                    github_url,
-                    ts_rank(to_tsvector('english', text), plainto_tsquery('english', %s)) as rank
-                FROM documents
-                WHERE {where_sql}
-                ORDER BY rank DESC
-                LIMIT %s
-            """, [query] + params)
-            
-            results = []
-            for row in cur.fetchall():
-                results.append({
-                    'chunk_id': row[0],
-                    'repo_name': row[1],
-                    'file_path': row[2],
-                    'file_type': row[3],
-                    'text': row[4],
-                    'commit_hash': row[5],
-                    'commit_date': row[6].isoformat() if row[6] else None,
-                    'author': row[7],
-                    'github_url': row[8],
-                    'rank': float(row[9])
-                })
-            
-            return results
+            self._execute_prepared(
+                conn,
+                cur,
+                _keyword_search_statement(bool(repo_name)),
+                params
+            )
             
-        finally:
-            cur.close()
-            conn.close()
+            return _search_results(cur, 'rank')
+    
+    async def semantic_search_async(self, *args, **kwargs) -> List[Dict]:
+        """
+        semantic_search without blocking the event loop
+        
+        Runs on a worker thread with its own pooled connection; psycopg2
+        releases the GIL while waiting on the server, so concurrent calls
+        overlap up to the pool size and the rest wait for a connection.
+        """
+        return await asyncio.to_thread(self.semantic_search, *args, **kwargs)
+    
+    async def keyword_search_async(self, *args, **kwargs) -> List[Dict]:
+        """keyword_search without blocking the event loop (see semantic_search_async)"""
+        return await asyncio.to_thread(self.keyword_search, *args, **kwargs)
     
     def get_stats(self) -> Dict:
-        """Get database statistics"""
-        conn = self._get_connection()
-        cur = conn.cursor()
+        """
+        Get database statistics
         
-        try:
+        total_chunks sums the planner's per-partition row estimates (exact as
+        of the last VACUUM/ANALYZE), and repo/file counts are as of the last
+        refresh_stats.
+        """
+        with self._conn() as conn, conn.cursor() as cur:
+            total_chunks, unanalyzed = self._estimate_chunk_count(cur)
+            
+            # Only partitions never vacuumed or analyzed are counted exactly
+            for partition in unanalyzed:
+                cur.execute(f"SELECT COUNT(*) FROM {partition}")
+                total_chunks += cur.fetchone()[0]
+            
             cur.execute("""
                 SELECT 
-                    COUNT(*) as total_chunks,
-                    COUNT(DISTINCT repo_name) as total_repos,
-                    COUNT(DISTINCT file_path) as total_files,
-                    MAX(last_indexed) as last_sync
-                FROM documents
+                    (SELECT COUNT(*) FROM documents_stats) as total_repos,
+                    (SELECT COALESCE(SUM(total_files), 0) FROM documents_stats) as total_files,
+                    (SELECT MAX(last_indexed) FROM documents) as last_sync
             """)
+            total_repos, total_files, last_sync = cur.fetchone()
             
-            row = cur.fetchone()
             return {
-                'total_chunks': row[0],
-                'total_repos': row[1],
-                'total_files': row[2],
-                'last_sync': row[3].isoformat() if row[3] else None
+                'total_chunks': total_chunks,
+                'total_repos': total_repos,
+                'total_files': total_files,
+                'last_sync': last_sync.isoformat() if last_sync else None
             }
-            
-        finally:
-            cur.close()
-            conn.close()
     
-    def delete_repo(self, repo_name: str) -> int:
-        """Delete all chunks from a repository"""
-        conn = self._get_connection()
-        cur = conn.cursor()
+    def _estimate_chunk_count(self, cur) -> Tuple[int, List[str]]:
+        """
+        Sum the planner's row estimates over the documents partitions
         
+        Returns:
+            Tuple of (estimated rows, partitions with no estimate yet). reltuples
+            is -1 until a partition is first vacuumed or analyzed; empty ones
+            (such as documents_default) count as zero instead.
+        """
+        cur.execute("""
+            SELECT
+                COALESCE(SUM(GREATEST(reltuples, 0)), 0)::bigint,
+                COALESCE(
+                    array_agg(quote_ident(relname))
+                        FILTER (WHERE reltuples < 0 AND pg_relation_size(pg_class.oid) > 0),
+                    '{}'
+                )
+            FROM pg_inherits
+            JOIN pg_class ON pg_class.oid = pg_inherits.inhrelid
+            WHERE inhparent = 'documents'::regclass
+        """)
+        return cur.fetchone()
+    
+    def refresh_stats(self):
+        """
+        Refresh the per-repo counts behind get_stats
+        
+        Call once after a batch of writes, e.g. at the end of an indexing run.
+        The refresh is concurrent, so get_stats readers are not blocked; a
+        failure only leaves the counts stale.
+        """
+        with self._conn() as conn, conn.cursor() as cur:
+            self._refresh_stats(conn, cur)
+    
+    def _refresh_stats(self, conn, cur):
+        """Refresh documents_stats on a borrowed connection, in its own transaction"""
         try:
-            cur.execute("DELETE FROM documents WHERE repo_name = %s", (repo_name,))
-            deleted = cur.rowcount
+            cur.execute(_REFRESH_STATS_SQL)
             conn.commit()
-            logger.info("Deleted repo chunks", repo=repo_name, count=deleted)
-            return deleted
-            
         except Exception as e:
             conn.rollback()
-            logger.error("Failed to delete repo", repo=repo_name, error=str(e))
-            raise
-        finally:
-            cur.close()
-            conn.close()
\ No newline at end of file
+            logger.warning("Failed to refresh stats", error=str(e))
+    
+    def get_indexed_commit(self, repo_name: str) -> Optional[str]:
+        """Get the last commit a repository was fully indexed at, if any"""
+        with self._conn() as conn, conn.cursor() as cur:
+            cur.execute(
+                "SELECT commit_hash FROM repo_index_state WHERE repo_name = %s",
+                (repo_name,)
+            )
+            row = cur.fetchone()
+            return row[0] if row else None
+    
+    def set_indexed_commit(self, repo_name: str, commit_hash: Optional[str]):
+        """
+        Record the commit a repository is now fully indexed at
+        
+        Args:
+            repo_name: Repository name
+            commit_hash: Indexed commit, or None to force a full reindex next time
+        """
+        with self._conn() as conn, conn.cursor() as cur:
+            if commit_hash is None:
+                cur.execute("DELETE FROM repo_index_state WHERE repo_name = %s", (repo_name,))
+            else:
+                cur.execute("""
+                    INSERT INTO repo_index_state (repo_name, commit_hash)
+                    VALUES (%s, %s)
+                    ON CONFLICT (repo_name) DO UPDATE SET
+                        commit_hash = EXCLUDED.commit_hash,
+                        indexed_at = DEFAULT
+                """, (repo_name, commit_hash))
+            conn.commit()
+    
+    def delete_files(self, repo_name: str, file_paths: Sequence[str]) -> int:
+        """
+        Delete the chunks of some files of a repository
+        
+        Args:
+            repo_name: Repository name
+            file_paths: File paths relative to the repo root
+        
+        Returns:
+            Number of chunks deleted
+        """
+        return self._delete_chunks(repo_name, "file_path = ANY(%s)", list(file_paths))
+    
+    def delete_chunks_except(self, repo_name: str, chunk_ids: Sequence[str]) -> int:
+        """
+        Delete every chunk of a repository not in chunk_ids
+        
+        Args:
+            repo_name: Repository name
+            chunk_ids: Chunk IDs to keep
+        
+        Returns:
+            Number of chunks deleted
+        """
+        return self._delete_chunks(repo_name, "chunk_id <> ALL(%s)", list(chunk_ids))
+    
+    def _delete_chunks(self, repo_name: str, condition: str, values: List[str]) -> int:
+        """Delete a repository's chunks matching a condition on one array parameter"""
+        with self._conn() as conn, conn.cursor() as cur:
+            cur.execute(
+                f"DELETE FROM documents WHERE repo_name = %s AND {condition}",
+                (repo_name, values)
+            )
+            deleted = cur.rowcount
+            conn.commit()
+        
+        if deleted:
+            self._memory_index_state.invalidate()
+        
+        return deleted
+    
+    def delete_repo(self, repo_name: str) -> int:
+        """Delete all chunks from a repository"""
+        with self._conn() as conn, conn.cursor() as cur:
+            try:
+                partition = _partition_name(repo_name)
+                cur.execute("""
+                    SELECT EXISTS (
+                        SELECT 1 FROM pg_inherits
+                        JOIN pg_class ON pg_class.oid = pg_inherits.inhrelid
+                        WHERE inhparent = 'documents'::regclass AND relname = %s
+                    )
+                """, (partition,))
+                
+                if cur.fetchone()[0]:
+                    # Dropping the partition is a catalog operation, unlike
+                    # deleting rows one by one out of the HNSW graph
+                    cur.execute(f"SELECT COUNT(*) FROM {partition}")
+                    deleted = cur.fetchone()[0]
+                    cur.execute(f"DROP TABLE {partition}")
+                else:
+                    cur.execute("DELETE FROM documents WHERE repo_name = %s", (repo_name,))
+                    deleted = cur.rowcount
+                
+                cur.execute("DELETE FROM repo_index_state WHERE repo_name = %s", (repo_name,))
+                conn.commit()
+                self._memory_index_state.invalidate()
+                self._refresh_stats(conn, cur)
+                
+                logger.info("Deleted repo chunks", repo=repo_name, count=deleted)
+                return deleted
+                
+            except Exception as e:
+                conn.rollback()
+                logger.error("Failed to delete repo", repo=repo_name, error=str(e))
+                raise
\ No newline at end of file
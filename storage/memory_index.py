@@ -0,0 +1,167 @@
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+    from usearch.index import Index
+except ImportError:
+    Index = None
+
+def parse_vector(text: str) -> "np.ndarray":
+    """Parse pgvector's text form, e.g. '[0.1,0.2]', in one C call"""
+    return np.fromstring(text[1:-1], sep=',', dtype=np.float32)
+
+def _chunk_key(chunk_id: str) -> int:
+    """64-bit index key from an md5 hex chunk ID"""
+    return int(chunk_id[:16], 16)
+
+class MemoryVectorIndex:
+    """In-process HNSW index over chunk embeddings (USearch, SIMD distance kernels)
+    
+    Repo-filtered searches skip the graph and score the repo's vectors exactly
+    against a cached, normalized float32 matrix (BLAS GEMV).
+    """
+    
+    # Candidates fetched per requested result when filters will discard some
+    FILTER_OVERSAMPLE = 10
+    
+    def __init__(self, dimensions: int = 1536):
+        self.index = Index(ndim=dimensions, metric="cos", dtype="f16")
+        self._chunks: Dict[int, Tuple[str, str, Optional[str]]] = {}  # key -> (chunk_id, repo, file_type)
+        self._repo_matrices: Dict[str, Tuple[List[int], "np.ndarray", "np.ndarray"]] = {}
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._chunks)
+    
+    def add(self, chunks: Iterable[Tuple[str, str, Optional[str], Sequence[float]]]):
+        """
+        Add or replace chunk embeddings
+        
+        Args:
+            chunks: Tuples of (chunk_id, repo_name, file_type, embedding)
+        """
+        keys = []
+        vectors = []
+        entries = {}
+        
+        for chunk_id, repo_name, file_type, embedding in chunks:
+            key = _chunk_key(chunk_id)
+            keys.append(key)
+            vectors.append(embedding)
+            entries[key] = (chunk_id, repo_name, file_type)
+        
+        if not keys:
+            return
+        
+        keys = np.array(keys, dtype=np.uint64)
+        vectors = np.array(vectors, dtype=np.float32)
+        
+        with self._lock:
+            existing = [key for key in entries if key in self._chunks]
+            if existing:
+                self.index.remove(np.array(existing, dtype=np.uint64))
+            
+            for key in existing:
+                self._repo_matrices.pop(self._chunks[key][1], None)
+            for _, repo_name, _ in entries.values():
+                self._repo_matrices.pop(repo_name, None)
+            
+            self.index.add(keys, vectors)
+            self._chunks.update(entries)
+    
+    def _repo_matrix(self, repo_name: str) -> Tuple[List[int], "np.ndarray", "np.ndarray"]:
+        """Keys, file types and unit-norm vectors of one repository (lock held)"""
+        cached = self._repo_matrices.get(repo_name)
+        if cached is not None:
+            return cached
+        
+        keys = [key for key, (_, repo, _) in self._chunks.items() if repo == repo_name]
+        file_types = np.array([self._chunks[key][2] for key in keys], dtype=object)
+        
+        matrix = self.index.get(np.array(keys, dtype=np.uint64), dtype=np.float32).reshape(len(keys), -1)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.maximum(norms, 1e-12)
+        
+        cached = self._repo_matrices[repo_name] = (keys, file_types, matrix)
+        return cached
+    
+    def _search_repo(
+        self,
+        query: "np.ndarray",
+        limit: int,
+        max_distance: float,
+        repo_name: str,
+        file_type: Optional[str]
+    ) -> List[Tuple[str, str, float]]:
+        """Exact search over one repository's vectors (lock held)"""
+        keys, file_types, matrix = self._repo_matrix(repo_name)
+        if not keys:
+            return []
+        
+        # One GEMV scores the whole repo
+        distances = 1 - matrix @ query
+        
+        candidates = np.flatnonzero(distances <= max_distance)
+        if file_type:
+            candidates = candidates[file_types[candidates] == file_type]
+        
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(distances[candidates], limit)[:limit]]
+        candidates = candidates[np.argsort(distances[candidates])]
+        
+        return [
+            (repo_name, self._chunks[keys[i]][0], float(distances[i]))
+            for i in candidates.tolist()
+        ]
+    
+    def search(
+        self,
+        query_embedding: Sequence[float],
+        limit: int,
+        max_distance: float,
+        repo_name: Optional[str] = None,
+        file_type: Optional[str] = None
+    ) -> Optional[List[Tuple[str, str, float]]]:
+        """
+        Find the nearest chunks within a cosine distance
+        
+        Returns:
+            List of (repo_name, chunk_id, distance), nearest first, or None when a
+            file type filter left too few candidates to be sure of the top results
+        """
+        filtered = bool(repo_name or file_type)
+        query = np.asarray(query_embedding, dtype=np.float32)
+        
+        with self._lock:
+            total = len(self._chunks)
+            if total == 0:
+                return []
+            
+            if repo_name:
+                query = query / max(float(np.linalg.norm(query)), 1e-12)
+                return self._search_repo(query, limit, max_distance, repo_name, file_type)
+            
+            count = min(limit * self.FILTER_OVERSAMPLE if filtered else limit, total)
+            matches = self.index.search(query, count)
+            
+            results = []
+            for key, distance in zip(matches.keys.tolist(), matches.distances.tolist()):
+                if distance > max_distance:
+                    return results
+                
+                chunk_id, chunk_repo, chunk_file_type = self._chunks[key]
+                if repo_name and chunk_repo != repo_name:
+                    continue
+                if file_type and chunk_file_type != file_type:
+                    continue
+                
+                results.append((chunk_repo, chunk_id, distance))
+                if len(results) == limit:
+                    return results
+        
+        # Filters discarded candidates and nearer matches may lie further out
+        if filtered and count < total:
+            return None
+        
+        return results
@@ -0,0 +1,33 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from config.settings import settings
+from storage.db import VectorDB
+
+def test_concurrent_searches_exceed_pool_size():
+    """More concurrent async searches than pooled connections wait instead of failing"""
+    db = VectorDB()
+    calls = settings.database.pool_size * 3
+    query_embedding = [0.1] * 1536
+    
+    async def run():
+        # Enough worker threads that every call is in flight at once
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=calls))
+        return await asyncio.gather(*(
+            db.semantic_search_async(query_embedding, limit=1, similarity_threshold=0)
+            if i % 2 else
+            db.keyword_search_async("install", limit=1)
+            for i in range(calls)
+        ))
+    
+    results = asyncio.run(run())
+    assert len(results) == calls
+
+if __name__ == "__main__":
+    print(f"Running {settings.database.pool_size * 3} concurrent searches "
+          f"against a pool of {settings.database.pool_size}...")
+    test_concurrent_searches_exceed_pool_size()
+    print(" All searches completed")
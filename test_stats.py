@@ -0,0 +1,28 @@
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from storage.db import VectorDB, _partition_name
+
+def test_fresh_partitions_take_the_estimate_path():
+    """Empty, never-analyzed partitions count as zero instead of forcing COUNT(*)"""
+    db = VectorDB()
+    repo = "stats-test/empty-repo"
+    
+    with db._conn() as conn, conn.cursor() as cur:
+        db._ensure_repo_partition(cur, repo)
+        conn.commit()
+    
+    try:
+        with db._conn() as conn, conn.cursor() as cur:
+            _, unanalyzed = db._estimate_chunk_count(cur)
+        
+        assert "documents_default" not in unanalyzed
+        assert _partition_name(repo) not in unanalyzed
+    finally:
+        db.delete_repo(repo)
+
+if __name__ == "__main__":
+    print("Checking get_stats on fresh partitions...")
+    test_fresh_partitions_take_the_estimate_path()
+    print(" Fresh partitions use the planner estimate")